@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+Mock Tracsis Server
+Local stand-in for the Tracsis API with synthetic data, injectable latency and errors
+
+Usage:
+    python benchmarks/mock_server.py --port 8099 --tasks 5000 --latency 0.05 --error-rate 0.02
+    tracsis --base-url http://127.0.0.1:8099/api/v1 tasks --all
+"""
+
+import argparse
+import base64
+import json
+import math
+import random
+import socket
+import threading
+import time
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+
+API_PREFIX = '/api/v1'
+
+WORK_TYPES = ['Development', 'Code Review', 'Testing', 'Documentation', 'Meeting']
+MODULES = ['Backend', 'Frontend', 'Mobile', 'DevOps', 'QA']
+
+
+def make_token(subject: str, ttl: int) -> str:
+    """Unsigned JWT-shaped token whose `exp` claim the CLI's token store understands"""
+    def encode(data):
+        return base64.urlsafe_b64encode(json.dumps(data).encode()).decode().rstrip('=')
+    return f"{encode({'alg': 'none'})}.{encode({'sub': subject, 'exp': int(time.time()) + ttl})}.mock"
+
+
+class Dataset:
+    """Deterministic synthetic projects, tasks and work logs"""
+
+    def __init__(self, tasks: int = 5000, projects: int = 50, logs: int = 20000,
+                 user_id: int = 6010, seed: int = 1):
+        rng = random.Random(seed)
+        start = date(2026, 1, 1)
+        self.user_id = user_id
+        self.projects = [
+            {
+                'hidden_project_id': 100 + i,
+                'project_name': f"Project {i:03d}",
+                'project_code': f"PRJ-{i:03d}",
+                'client_name': f"Client {i % 12}",
+                'status': 'Active',
+            }
+            for i in range(projects)
+        ]
+        self.tasks = []
+        for i in range(tasks):
+            project = self.projects[rng.randrange(projects)]
+            delivery = start + timedelta(days=rng.randrange(365))
+            self.tasks.append({
+                'hidden_task_id': 10000 + i,
+                'task_code': f"T-{10000 + i}",
+                'task_title': f"Task {i}: {rng.choice(WORK_TYPES)} for {project['project_name']}",
+                'hidden_project_id': project['hidden_project_id'],
+                'project_name': project['project_name'],
+                'module_name': rng.choice(MODULES),
+                'assign_user_id': user_id,
+                'estimated_hour': rng.choice([1, 2, 4, 8, 16]),
+                'estimated_delivery_date': delivery.isoformat(),
+                'formatted_date': delivery.strftime('%d %b %Y'),
+                'task_status': rng.choice(['In Progress', 'Completed', 'Pending']),
+                'created_at': (delivery - timedelta(days=14)).isoformat() + 'T09:00:00',
+                'updated_at': delivery.isoformat() + 'T17:00:00',
+            })
+        self.logs = []
+        for i in range(logs):
+            task = self.tasks[rng.randrange(tasks)] if tasks else {'hidden_task_id': 0, 'task_title': ''}
+            work_date = start + timedelta(days=rng.randrange(365))
+            self.logs.append({
+                'hidden_log_id': 500000 + i,
+                'task_id': task['hidden_task_id'],
+                'task_title': task['task_title'],
+                'work_title': f"{rng.choice(WORK_TYPES)} session {i}",
+                'work_type': rng.choice(WORK_TYPES),
+                'work_date': work_date.isoformat(),
+                'log_hour': rng.choice([0.5, 1, 1.5, 2, 3, 4]),
+                'user_name': 'Mock User',
+                'log_details': None,
+            })
+        self.lock = threading.Lock()
+
+    def grid(self, slug: str) -> List[Dict[str, Any]]:
+        return {
+            'pts_my_tasks': self.tasks,
+            'pts_active_projects': self.projects,
+            'pts_my_logs': self.logs,
+        }.get(slug, [])
+
+    def add_task(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        with self.lock:
+            project = next((p for p in self.projects if p['hidden_project_id'] == payload.get('project_id')), {})
+            task = {
+                'hidden_task_id': 10000 + len(self.tasks),
+                'task_title': payload.get('task_title'),
+                'hidden_project_id': payload.get('project_id'),
+                'project_name': project.get('project_name'),
+                'module_name': MODULES[0],
+                'assign_user_id': payload.get('assign_user_id'),
+                'estimated_hour': payload.get('estimated_hour'),
+                'estimated_delivery_date': payload.get('estimated_delivery_date'),
+                'formatted_date': payload.get('estimated_delivery_date'),
+                'task_status': 'Pending',
+            }
+            self.tasks.append(task)
+            return task
+
+    def add_logs(self, payload: Dict[str, Any]) -> List[Dict[str, Any]]:
+        with self.lock:
+            added = []
+            for work in payload.get('work') or []:
+                log = {
+                    'hidden_log_id': 500000 + len(self.logs),
+                    'task_id': payload.get('task_id'),
+                    'work_title': work.get('work_title'),
+                    'work_type': work.get('work_type'),
+                    'work_date': work.get('work_date'),
+                    'log_hour': work.get('log_hour'),
+                    'user_name': 'Mock User',
+                    'log_details': work.get('log_details'),
+                }
+                self.logs.append(log)
+                added.append(log)
+            return added
+
+
+class MockTracsisServer(ThreadingHTTPServer):
+    """HTTP server answering the Tracsis API endpoints the CLI uses
+
+    Args:
+        address: (host, port); port 0 picks a free one
+        dataset: Data served by the grid endpoint
+        latency: Seconds added to every response
+        jitter: Up to this many extra seconds, uniformly random
+        error_rate: Fraction of authenticated requests answered with `error_status`
+        error_status: Status of injected errors (503 comes with Retry-After: 0)
+        token_ttl: Lifetime of issued access tokens in seconds
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int] = ('127.0.0.1', 0), dataset: Optional[Dataset] = None,
+                 latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0,
+                 error_status: int = 503, token_ttl: int = 3600, seed: int = 1):
+        super().__init__(address, MockRequestHandler)
+        self.dataset = dataset or Dataset()
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.token_ttl = token_ttl
+        self.random = random.Random(seed)
+        self.issued_tokens = set()
+        self.requests_served = 0
+        self.lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}{API_PREFIX}"
+
+    def start(self) -> 'MockTracsisServer':
+        """Serve from a background thread"""
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def issue_tokens(self, subject: str) -> Dict[str, Any]:
+        access_token = make_token(subject, self.token_ttl)
+        refresh_token = make_token(f"{subject}:refresh", self.token_ttl * 24)
+        with self.lock:
+            self.issued_tokens.add(access_token)
+        return {'access_token': access_token, 'refresh_token': refresh_token}
+
+    def delay_and_fail(self) -> bool:
+        """Apply the configured latency; return True if this request should fail"""
+        with self.lock:
+            self.requests_served += 1
+            delay = self.latency + (self.random.uniform(0, self.jitter) if self.jitter else 0)
+            fail = self.error_rate > 0 and self.random.random() < self.error_rate
+        if delay:
+            time.sleep(delay)
+        return fail
+
+
+class MockRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def setup(self):
+        super().setup()
+        # Headers and body go out in separate writes; without this Nagle's
+        # algorithm adds ~40 ms to every keep-alive response
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_json(self, status: int, body: Dict[str, Any], headers: Optional[Dict[str, str]] = None):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        try:
+            payload = json.loads(self.rfile.read(length) or b'{}')
+        except json.JSONDecodeError:
+            self.send_json(400, {'error': True, 'message': 'Invalid JSON body'})
+            return
+
+        server = self.server
+        fail = server.delay_and_fail()
+        path = self.path[len(API_PREFIX):] if self.path.startswith(API_PREFIX) else self.path
+
+        if path == '/auth/login':
+            if not payload.get('user') or not payload.get('password'):
+                self.send_json(422, {'error': True, 'message': 'user and password are required'})
+                return
+            data = server.issue_tokens(payload['user'])
+            data.update({'user_id': server.dataset.user_id, 'user_code': 'MOCK-1', 'user_name': 'Mock User'})
+            self.send_json(200, {'error': False, 'message': 'Login successful', 'data': data})
+            return
+        if path == '/auth/refresh':
+            if not payload.get('refresh_token'):
+                self.send_json(401, {'error': True, 'message': 'Invalid refresh token'})
+                return
+            self.send_json(200, {'error': False, 'data': server.issue_tokens('refresh')})
+            return
+
+        token = (self.headers.get('Authorization') or '')[len('Bearer '):]
+        if token not in server.issued_tokens:
+            self.send_json(401, {'error': True, 'message': 'Unauthenticated'})
+            return
+        if fail:
+            headers = {'Retry-After': '0'} if server.error_status == 503 else None
+            self.send_json(server.error_status, {'error': True, 'message': 'Injected failure'}, headers)
+            return
+
+        if path == '/master-grid/grid-data':
+            self.send_json(200, grid_response(server.dataset, payload))
+        elif path == '/pts/task':
+            self.send_json(200, {'error': False, 'message': 'Task created', 'data': server.dataset.add_task(payload)})
+        elif path == '/pts/task/log':
+            self.send_json(200, {'error': False, 'message': 'Work logged', 'data': server.dataset.add_logs(payload)})
+        else:
+            self.send_json(404, {'error': True, 'message': f"Unknown endpoint {path}"})
+
+
+def search_value(value: Any):
+    """A value as a number when it is one, else as lower-case text"""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return '' if value is None else str(value).lower()
+
+
+def matches_search(row: Dict[str, Any], search_key: Dict[str, Any], search_data: List[Dict[str, Any]]) -> bool:
+    """Grid search: search_key columns match as substrings, search_data conditions as comparisons"""
+    for column, value in search_key.items():
+        if str(value).lower() not in str(row.get(column, '')).lower():
+            return False
+    for condition in search_data:
+        left, right = search_value(row.get(condition.get('key'))), search_value(condition.get('value'))
+        if type(left) is not type(right):
+            left, right = str(row.get(condition.get('key'), '')).lower(), str(condition.get('value')).lower()
+        operator = condition.get('operator')
+        if not ((operator == '>' and left > right) or (operator == '>=' and left >= right)
+                or (operator == '<' and left < right) or (operator == '<=' and left <= right)):
+            return False
+    return True
+
+
+def grid_response(dataset: Dataset, payload: Dict[str, Any]) -> Dict[str, Any]:
+    """One page of a grid, shaped like master-grid/grid-data"""
+    rows = dataset.grid(payload.get('slug'))
+    search_key = payload.get('search_key') or {}
+    search_data = payload.get('search_data') or []
+    if search_key or search_data:
+        rows = [row for row in rows if matches_search(row, search_key, search_data)]
+    page = max(1, int(payload.get('page') or 1))
+    per_page = max(1, int(payload.get('per_page') or 10))
+    items = rows[(page - 1) * per_page:page * per_page]
+    return {
+        'error': False,
+        'data': {
+            'items': items,
+            'total': len(rows),
+            'current_page': page,
+            'per_page': per_page,
+            'last_page': max(1, math.ceil(len(rows) / per_page)),
+        }
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local mock of the Tracsis API')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8099)
+    parser.add_argument('--tasks', type=int, default=5000, help='Synthetic tasks (default: 5000)')
+    parser.add_argument('--projects', type=int, default=50, help='Synthetic projects (default: 50)')
+    parser.add_argument('--logs', type=int, default=20000, help='Synthetic work logs (default: 20000)')
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds added to every response')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Up to this many extra random seconds')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests that fail (0-1)')
+    parser.add_argument('--error-status', type=int, default=503, help='Status of injected failures (default: 503)')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    dataset = Dataset(args.tasks, args.projects, args.logs, seed=args.seed)
+    server = MockTracsisServer((args.host, args.port), dataset, args.latency, args.jitter,
+                               args.error_rate, args.error_status, seed=args.seed)
+    print(f"Mock Tracsis API on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
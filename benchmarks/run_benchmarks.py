@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Tracsis Benchmarks
+Latency percentiles and throughput of the API paths behind tasks, logs, create-task and bulk imports
+
+Runs against an in-process mock server by default, so no network or
+credentials are needed:
+
+    python benchmarks/run_benchmarks.py --latency 0.02 --save results.json
+    python benchmarks/run_benchmarks.py --latency 0.02 --baseline results.json
+
+With --baseline, exits with status 1 if a scenario got slower than the
+saved results by more than --threshold.
+"""
+
+import argparse
+import json
+import math
+import os
+import sys
+import time
+from typing import Any, Callable, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from grid_filters import parse_where  # noqa: E402
+from mock_server import Dataset, MockTracsisServer  # noqa: E402
+from tracing import RequestTracer  # noqa: E402
+from tracsis_api import TracsisAPI, TracsisAPIError  # noqa: E402
+from transport import TransportSettings  # noqa: E402
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of `values` (0 for an empty list)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+class Scenario:
+    """A named operation run `repeat` times
+
+    `operation(api, index)` performs one operation and returns the number of
+    rows it produced or submitted.
+    """
+
+    def __init__(self, name: str, description: str, operation: Callable[[TracsisAPI, int], int]):
+        self.name = name
+        self.description = description
+        self.operation = operation
+
+    def run(self, api: TracsisAPI, repeat: int) -> Dict[str, Any]:
+        tracer = RequestTracer()
+        api.request_hooks = [tracer]
+        latencies = []
+        rows = 0
+        failures = 0
+        start = time.perf_counter()
+        for index in range(repeat):
+            op_start = time.perf_counter()
+            try:
+                rows += self.operation(api, index)
+            except TracsisAPIError:
+                failures += 1
+            latencies.append(time.perf_counter() - op_start)
+        wall = time.perf_counter() - start
+        api.request_hooks = []
+
+        attempts = [record for record in tracer.records if record['event'] == 'request']
+        request_latencies = [record['total'] for record in attempts]
+        return {
+            'operations': repeat,
+            'failures': failures,
+            'wall': wall,
+            'ops_per_second': repeat / wall if wall else 0.0,
+            'rows': rows,
+            'rows_per_second': rows / wall if wall else 0.0,
+            'p50': percentile(latencies, 50),
+            'p90': percentile(latencies, 90),
+            'p99': percentile(latencies, 99),
+            'requests': len(attempts),
+            'retries': sum(1 for record in attempts if record['attempt']),
+            'request_p50': percentile(request_latencies, 50),
+            'request_p99': percentile(request_latencies, 99),
+            'bytes_in': sum(record['bytes_in'] or 0 for record in attempts),
+        }
+
+
+def checked(response: Dict[str, Any]) -> Dict[str, Any]:
+    if response.get('error'):
+        raise TracsisAPIError(response)
+    return response
+
+
+def build_scenarios(user_id: int, task_id: int, project_id: int, jobs: int, batch: int) -> List[Scenario]:
+    def tasks_page(api, index):
+        return len(checked(api.get_task_list(user_id, 1, 10))['data']['items'])
+
+    def tasks_all(api, index):
+        return sum(1 for _ in api.iter_task_list(user_id, per_page=100, jobs=jobs))
+
+    where = parse_where(['project_name=Project 001', 'estimated_delivery_date>=2026-10-01'])
+
+    def tasks_where(api, index):
+        return sum(1 for _ in api.iter_task_list(user_id, per_page=100, jobs=jobs, where=where))
+
+    def logs_all(api, index):
+        return sum(1 for _ in api.iter_task_logs(task_id, per_page=100, jobs=jobs))
+
+    def create_task(api, index):
+        checked(api.create_task(f"Benchmark task {index}", user_id, '2026-12-31', 2, project_id))
+        return 1
+
+    def log_work(api, index):
+        checked(api.log_task_work(task_id, 'i', f"Benchmark work {index}", '2026-10-01', 1))
+        return 1
+
+    def bulk_import(api, index):
+        entries = [{'work_title': f"Imported {index}.{i}", 'work_date': '2026-10-01', 'log_hour': 0.5}
+                   for i in range(batch)]
+        checked(api.log_task_work_entries(task_id, 'i', entries))
+        return batch
+
+    return [
+        Scenario('tasks', 'tasks: first page of 10', tasks_page),
+        Scenario('tasks-all', f'tasks --all --per-page 100 --jobs {jobs}', tasks_all),
+        Scenario('tasks-where', 'tasks --all --where project=... --where delivery>=...', tasks_where),
+        Scenario('logs-all', f'logs <id> --all --per-page 100 --jobs {jobs}', logs_all),
+        Scenario('create-task', 'create-task: one task per request', create_task),
+        Scenario('logs', 'logs <id>: one work entry per request', log_work),
+        Scenario('logs-import', f'logs import: {batch} entries per request', bulk_import),
+    ]
+
+
+def print_results(results: Dict[str, Dict[str, Any]], descriptions: Dict[str, str]):
+    print(f"\n{'Scenario':<13} {'ops':>5} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'ops/s':>8} "
+          f"{'rows/s':>9} {'reqs':>6} {'retries':>7} {'req p50':>8}")
+    print('-' * 92)
+    for name, result in results.items():
+        print(f"{name:<13} {result['operations']:>5} {result['p50'] * 1000:>9.1f} {result['p90'] * 1000:>9.1f} "
+              f"{result['p99'] * 1000:>9.1f} {result['ops_per_second']:>8.1f} {result['rows_per_second']:>9.0f} "
+              f"{result['requests']:>6} {result['retries']:>7} {result['request_p50'] * 1000:>7.1f}ms")
+        if result['failures']:
+            print(f"{'':<13} ✗ {result['failures']} operations failed")
+    print()
+    for name, description in descriptions.items():
+        if name in results:
+            print(f"  {name:<13} {description}")
+
+
+def compare(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]], threshold: float) -> List[str]:
+    """Describe scenarios whose median latency or throughput regressed beyond `threshold`"""
+    regressions = []
+    for name, result in results.items():
+        before = baseline.get(name)
+        if not before:
+            continue
+        if before['p50'] and result['p50'] > before['p50'] * (1 + threshold):
+            regressions.append(f"{name}: p50 {before['p50'] * 1000:.1f}ms -> {result['p50'] * 1000:.1f}ms")
+        if before['ops_per_second'] and result['ops_per_second'] < before['ops_per_second'] * (1 - threshold):
+            regressions.append(f"{name}: {before['ops_per_second']:.1f} -> {result['ops_per_second']:.1f} ops/s")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the Tracsis API client against a mock server')
+    parser.add_argument('--base-url', default=None, help='Benchmark a running server instead of an in-process mock')
+    parser.add_argument('--user', default='bench@example.com', help='Login user (default: mock user)')
+    parser.add_argument('--password', default='bench', help='Login password')
+    parser.add_argument('--tasks', type=int, default=5000, help='Mock tasks (default: 5000)')
+    parser.add_argument('--logs', type=int, default=20000, help='Mock work logs (default: 20000)')
+    parser.add_argument('--latency', type=float, default=0.0, help='Mock latency per response in seconds')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Mock latency jitter in seconds')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of mock requests that fail with 503')
+    parser.add_argument('--repeat', type=int, default=20, help='Operations per scenario (default: 20)')
+    parser.add_argument('--bulk-repeat', type=int, default=3, help='Operations per --all scenario (default: 3)')
+    parser.add_argument('--jobs', type=int, default=4, help='Concurrent pages for --all scenarios (default: 4)')
+    parser.add_argument('--batch', type=int, default=20, help='Entries per logs-import request (default: 20)')
+    parser.add_argument('--only', action='append', help='Scenario to run (repeatable, default: all)')
+    parser.add_argument('--save', metavar='FILE', help='Write results as JSON')
+    parser.add_argument('--baseline', metavar='FILE', help='Compare with results saved by --save')
+    parser.add_argument('--threshold', type=float, default=0.2, help='Allowed slowdown against the baseline (default: 0.2)')
+    args = parser.parse_args()
+
+    server = None
+    base_url = args.base_url
+    if base_url is None:
+        print(f"Generating {args.tasks} tasks and {args.logs} logs...")
+        server = MockTracsisServer(dataset=Dataset(args.tasks, logs=args.logs), latency=args.latency,
+                                   jitter=args.jitter, error_rate=args.error_rate).start()
+        base_url = server.base_url
+    print(f"Benchmarking {base_url}")
+
+    api = TracsisAPI(TransportSettings(retries=5, backoff=0.05, max_backoff=1.0), base_url)
+    login = api.login(args.user, args.password)
+    if login.get('error'):
+        print(f"✗ Login failed: {login.get('message')}")
+        sys.exit(1)
+    user_id = login['data'].get('user_id', 6010)
+
+    # Use a real task and project from the server for the write scenarios
+    first_task = checked(api.get_task_list(user_id, 1, 1))['data']['items'][0]
+    task_id = first_task['hidden_task_id']
+    project_id = first_task.get('hidden_project_id', 1)
+
+    scenarios = build_scenarios(user_id, task_id, project_id, args.jobs, args.batch)
+    results = {}
+    for scenario in scenarios:
+        if args.only and scenario.name not in args.only:
+            continue
+        repeat = args.bulk_repeat if scenario.name.endswith('-all') else args.repeat
+        print(f"  {scenario.name}...", flush=True)
+        results[scenario.name] = scenario.run(api, repeat)
+
+    if server is not None:
+        server.shutdown()
+        server.server_close()
+
+    print_results(results, {scenario.name: scenario.description for scenario in scenarios})
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults saved to {args.save}")
+
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n✗ Regressions beyond {args.threshold:.0%}:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print(f"\n✓ No regressions beyond {args.threshold:.0%} against {args.baseline}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+Tracsis Cassettes
+Record API traffic to a file and replay it offline through the same session
+"""
+
+import atexit
+import base64
+import io
+import json
+import os
+import re
+import threading
+import time
+from collections import defaultdict, deque
+from datetime import timedelta
+from typing import Any, Dict, Optional
+from urllib.parse import urlparse
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from transport import TimedHTTPAdapter
+
+
+CASSETTE_VERSION = 1
+
+# Body fields never written to a cassette
+TOKEN_FIELDS = ('access_token', 'refresh_token', 'token')
+SECRET_FIELDS = ('password',)
+
+# Response headers kept in a cassette; bodies are stored decoded
+KEPT_HEADERS = ('Content-Type', 'Retry-After')
+
+# The task list's extra_condition names the user it was recorded for
+ASSIGNEE_PATTERN = re.compile(r'assign_user_id\s*=\s*(\d+)')
+
+
+class CassetteMiss(requests.exceptions.RequestException):
+    """Raised on replay when the cassette holds no response for a request
+
+    Not a ConnectionError, so the transport does not retry it.
+    """
+
+
+def placeholder_token() -> str:
+    """JWT-shaped stand-in for a scrubbed token that never expires"""
+    def encode(data):
+        return base64.urlsafe_b64encode(json.dumps(data).encode()).decode().rstrip('=')
+    return f"{encode({'alg': 'none'})}.{encode({'sub': 'cassette', 'exp': 2 ** 31 - 1})}.scrubbed"
+
+
+def scrub(value: Any) -> Any:
+    """Copy of a JSON value with tokens replaced by placeholders and passwords masked"""
+    if isinstance(value, dict):
+        scrubbed = {}
+        for key, item in value.items():
+            if key in TOKEN_FIELDS and isinstance(item, str):
+                scrubbed[key] = placeholder_token()
+            elif key in SECRET_FIELDS:
+                scrubbed[key] = '********'
+            else:
+                scrubbed[key] = scrub(item)
+        return scrubbed
+    if isinstance(value, list):
+        return [scrub(item) for item in value]
+    return value
+
+
+def decode_body(body) -> Any:
+    """Request or response body as JSON if possible, else as text"""
+    if body is None:
+        return None
+    if isinstance(body, bytes):
+        body = body.decode('utf-8', errors='replace')
+    try:
+        return json.loads(body)
+    except ValueError:
+        return body
+
+
+def request_key(method: str, url: str, body: Any) -> str:
+    """Match key of a request: method, URL path and scrubbed body
+
+    The host is left out so a cassette recorded against one server replays
+    against any --base-url.
+    """
+    return json.dumps([method, urlparse(url).path, scrub(body)], sort_keys=True)
+
+
+class Cassette:
+    """Recorded request/response pairs kept in a JSON file"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.interactions = []
+        self.unsaved = False
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: str) -> 'Cassette':
+        cassette = cls(path)
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('version') != CASSETTE_VERSION:
+            raise ValueError(f"Unsupported cassette version in {path}")
+        cassette.interactions = data['interactions']
+        return cassette
+
+    def add(self, request: requests.PreparedRequest, response: requests.Response, seconds: float):
+        """Append one scrubbed interaction; the file is written by save()"""
+        interaction = {
+            'request': {
+                'method': request.method,
+                'path': urlparse(request.url).path,
+                'body': scrub(decode_body(request.body)),
+            },
+            'response': {
+                'status': response.status_code,
+                'headers': {name: response.headers[name] for name in KEPT_HEADERS if name in response.headers},
+                'body': scrub(decode_body(response.content)),
+            },
+            'seconds': seconds,
+        }
+        with self._lock:
+            self.interactions.append(interaction)
+            self.unsaved = True
+
+    def save(self):
+        """Write the cassette if interactions were added since it was last written"""
+        with self._lock:
+            if not self.unsaved:
+                return
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'version': CASSETTE_VERSION, 'interactions': self.interactions}, f, indent=1)
+            os.replace(tmp_path, self.path)
+            self.unsaved = False
+
+
+class RecordingAdapter(TimedHTTPAdapter):
+    """Sends requests for real and records each exchange into a cassette"""
+
+    def __init__(self, cassette: Cassette, pool_size: int):
+        super().__init__(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.cassette = cassette
+
+    def send(self, request, **kwargs):
+        start = time.perf_counter()
+        response = super().send(request, **kwargs)
+        # Read the body here so the recorded latency covers the whole response
+        response.content
+        self.cassette.add(request, response, time.perf_counter() - start)
+        return response
+
+
+class ReplayAdapter(requests.adapters.BaseAdapter):
+    """Answers requests from a cassette instead of the network
+
+    Identical requests are answered with their recorded responses in
+    order; once those run out the last one is repeated.
+
+    Args:
+        cassette: Loaded cassette
+        speed: Multiplier of the recorded latencies; 0 replays instantly
+    """
+
+    def __init__(self, cassette: Cassette, speed: float = 0.0):
+        super().__init__()
+        self.speed = speed
+        self._lock = threading.Lock()
+        self._queues = defaultdict(deque)
+        self._last = {}
+        for interaction in cassette.interactions:
+            recorded = interaction['request']
+            key = request_key(recorded['method'], recorded['path'], recorded['body'])
+            self._queues[key].append(interaction)
+
+    def next_interaction(self, request: requests.PreparedRequest) -> Optional[Dict[str, Any]]:
+        key = request_key(request.method, request.url, decode_body(request.body))
+        with self._lock:
+            if self._queues[key]:
+                self._last[key] = self._queues[key].popleft()
+            return self._last.get(key)
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        interaction = self.next_interaction(request)
+        if interaction is None:
+            raise CassetteMiss(f"No recorded response for {request.method} {urlparse(request.url).path}",
+                               request=request)
+        if self.speed:
+            time.sleep(interaction['seconds'] * self.speed)
+
+        recorded = interaction['response']
+        body = recorded['body']
+        content = (body if isinstance(body, str) else json.dumps(body)).encode('utf-8')
+
+        response = requests.Response()
+        response.status_code = recorded['status']
+        response.headers = CaseInsensitiveDict(recorded.get('headers') or {})
+        response.headers['Content-Length'] = str(len(content))
+        response.raw = io.BytesIO(content)
+        response.url = request.url
+        response.request = request
+        response.encoding = 'utf-8'
+        response.reason = 'Replayed'
+        response.elapsed = timedelta(seconds=interaction['seconds'] * self.speed)
+        response.connection = self
+        return response
+
+    def close(self):
+        pass
+
+
+def recorded_user_id(path: str) -> Optional[int]:
+    """ID of the user whose traffic the cassette at `path` holds, if it shows
+
+    Taken from a recorded login, task list or task creation, so commands
+    that send the user ID replay without a profile in config.json.
+    """
+    for interaction in Cassette.load(path).interactions:
+        body = interaction['request']['body']
+        if not isinstance(body, dict):
+            continue
+        if isinstance(body.get('assign_user_id'), int):
+            return body['assign_user_id']
+        match = ASSIGNEE_PATTERN.search(json.dumps(body.get('extra')))
+        if match:
+            return int(match.group(1))
+        response = interaction['response']['body']
+        data = response.get('data') if isinstance(response, dict) else None
+        if isinstance(data, dict) and isinstance(data.get('user_id'), int) and 'access_token' in data:
+            return data['user_id']
+    return None
+
+
+def recording_factory(path: str):
+    """Adapter factory for TracsisAPI that records into the cassette at `path`
+
+    An existing cassette is appended to, so several commands can be recorded
+    into one file. Interactions are kept in memory and written once, when
+    the process exits.
+    """
+    cassette = Cassette.load(path) if os.path.exists(path) else Cassette(path)
+    atexit.register(cassette.save)
+    return lambda pool_size: RecordingAdapter(cassette, pool_size)
+
+
+def replay_factory(path: str, speed: float = 0.0):
+    """Adapter factory for TracsisAPI that replays the cassette at `path`"""
+    adapter = ReplayAdapter(Cassette.load(path), speed)
+    return lambda pool_size: adapter
@@ -4,12 +4,17 @@
 import json
 import sys
 import os
-from tracsis_api import TracsisAPI
-import readline
+from token_store import TokenStore
 
 # Global API instance to maintain session and tokens across commands
 api_instance = None
 
+# (record, replay, replay_speed) cassette options the API instance is set up for
+cassette_options = (None, None, 0.0)
+
+# Configured user when the API instance's tokens were last checked (see drop_stale_tokens)
+tokens_user = None
+
 def load_config():
     """Load configuration from config.json file"""
     config_path = os.path.join(os.path.dirname(__file__), 'config.json')
@@ -23,16 +28,212 @@ def load_config():
         print("Error: config.json is not a valid JSON file.")
         sys.exit(1)
 
-def get_api_instance():
-    """Get or create the global API instance"""
+def get_api_instance(args=None):
+    """Get or create the global API instance
+    
+    Args:
+        args: Parsed command line; its transport and base URL flags override
+            config.json and its request tracers are attached to the instance
+    """
     global api_instance
     if api_instance is None:
-        api_instance = TracsisAPI()
+        # Imported here so commands that never reach the network skip loading requests
+        from tracsis_api import TracsisAPI
+        api_instance = TracsisAPI(get_transport_settings(args), get_base_url(args))
+        api_instance.token_store = get_token_store(api_instance.base_url)
+        api_instance.cache = get_response_cache()
+    elif args is not None:
+        # A long-lived instance (shell, daemon) takes each command's own settings
+        api_instance.set_transport(get_transport_settings(args))
+        base_url = get_base_url(args)
+        if base_url != api_instance.base_url:
+            api_instance.set_base_url(base_url)
+            api_instance.token_store = get_token_store(base_url)
+    if args is not None:
+        apply_cassette_options(api_instance, args)
+        # Tracers set up for --trace/--profile (see tracing.run_instrumented)
+        api_instance.request_hooks = list(getattr(args, 'request_tracers', []))
     return api_instance
 
+def apply_cassette_options(api, args):
+    """Record the API traffic of a command to a cassette (--record) or answer it from one (--replay)
+
+    Replays run without credentials: the client starts with placeholder
+    tokens and any login it performs is kept in its own token store section.
+    The response cache is bypassed so every request reaches the cassette.
+    """
+    global cassette_options
+    options = (getattr(args, 'record', None), getattr(args, 'replay', None),
+               getattr(args, 'replay_speed', None) or 0.0)
+    if options != cassette_options:
+        import cassette
+        record, replay, speed = options
+        try:
+            if replay:
+                factory = cassette.replay_factory(replay, speed)
+            else:
+                factory = cassette.recording_factory(record) if record else None
+        except (OSError, ValueError, KeyError) as e:
+            print(f"✗ Cannot read cassette {replay or record}: {e}")
+            sys.exit(1)
+        api.set_adapter_factory(factory)
+        if cassette_options[1] and not replay:
+            # Leaving a replay: drop its placeholder tokens
+            api.set_base_url(api.base_url)
+            api.token_store = get_token_store(api.base_url)
+        cassette_options = options
+    if options[1]:
+        from cassette import placeholder_token
+        api.token_store = TokenStore(section='secret:replay')
+        if not api.is_authenticated():
+            api.set_tokens(placeholder_token(), placeholder_token())
+    if options[0] or options[1]:
+        api.cache = None
+
+def require_credentials(api):
+    """Exit unless config.json holds usable credentials; replays need none"""
+    if cassette_options[1]:
+        return
+    if not api.check_credentials():
+        print("Error: Invalid or missing credentials in config.json")
+        sys.exit(1)
+
+def get_user_id():
+    """ID of the configured user; a replay uses the one recorded in its cassette"""
+    if cassette_options[1]:
+        from cassette import recorded_user_id
+        user_id = recorded_user_id(cassette_options[1])
+        if user_id is not None:
+            return user_id
+    profile = load_optional_config().get('profile_data')
+    if isinstance(profile, dict) and profile.get('user_id') is not None:
+        return profile['user_id']
+    print("Error: No profile_data in config.json, run 'tracsis set-creds'")
+    sys.exit(1)
+
+def load_optional_config():
+    """config.json as a dict, or an empty dict if it is missing or unreadable"""
+    try:
+        with open(os.path.join(os.path.dirname(__file__), 'config.json'), 'r') as f:
+            config = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+    return config if isinstance(config, dict) else {}
+
+def get_base_url(args=None):
+    """API root from --base-url, $TRACSIS_BASE_URL or "base_url" in config.json"""
+    from tracsis_api import TracsisAPI
+    base_url = (getattr(args, 'base_url', None) or os.environ.get('TRACSIS_BASE_URL')
+                or load_optional_config().get('base_url') or TracsisAPI.BASE_URL)
+    return base_url.rstrip('/')
+
+def get_transport_settings(args=None):
+    """Transport settings from the "transport" section of config.json and the command line"""
+    from transport import TransportSettings
+    values = load_optional_config().get('transport')
+    values = dict(values) if isinstance(values, dict) else {}
+    for key in ('pool_size', 'connect_timeout', 'read_timeout', 'retries'):
+        if getattr(args, key, None) is not None:
+            values[key] = getattr(args, key)
+    try:
+        return TransportSettings.from_dict(values)
+    except (TypeError, ValueError) as e:
+        print(f"Error: Invalid transport settings in config.json or options: {e}")
+        sys.exit(1)
+
+def get_configured_user():
+    """User name of the credentials in config.json, or '' if there are none"""
+    credentials = load_optional_config().get('credentials')
+    return credentials.get('user', '') if isinstance(credentials, dict) else ''
+
+def get_response_cache():
+    """Get the response cache, namespaced per configured user"""
+    from response_cache import ResponseCache
+    return ResponseCache(namespace=get_configured_user())
+
+def get_local_mirror(base_url):
+    """Open the local mirror of an API root and the configured user"""
+    from local_mirror import LocalMirror, mirror_path
+    return LocalMirror(mirror_path(base_url, get_configured_user()))
+
+def apply_cache_options(api, args):
+    """Apply the --no-cache/--refresh options of a command"""
+    if getattr(args, 'no_cache', False):
+        api.cache = None
+    if getattr(args, 'refresh', False):
+        api.refresh_cache = True
+
+def reset_command_options(api):
+    """Undo the per-command cache options of a previous command on a long-lived API instance"""
+    api.cache = get_response_cache()
+    api.refresh_cache = False
+    api.row_fields = None
+    drop_stale_tokens(api)
+
+def drop_stale_tokens(api):
+    """Forget in-memory tokens once config.json holds newer ones or names another account
+
+    A long-lived instance (shell, daemon) otherwise keeps sending the tokens
+    it signed in with after `set-creds` switched accounts in another process;
+    ensure_authenticated then loads the saved ones.
+    """
+    global tokens_user
+    user = get_configured_user()
+    if api.is_authenticated() and not cassette_options[1]:
+        saved_token = api.token_store.load().get('access_token')
+        if (tokens_user is not None and user != tokens_user) or (saved_token and saved_token != api.access_token):
+            api.clear_tokens()
+    tokens_user = user
+
+def get_token_store(base_url=None):
+    """Get the token store backed by config.json
+    
+    Tokens of a non-default API root are kept apart from the production ones.
+    """
+    from tracsis_api import TracsisAPI
+    if base_url is None or base_url == TracsisAPI.BASE_URL:
+        return TokenStore()
+    return TokenStore(section=f"secret:{base_url}")
+
+def ensure_authenticated(api):
+    """Authenticate the API instance from saved tokens, logging in only when they are unusable"""
+    if api.is_authenticated():
+        return
+    
+    response = api.token_store.authenticate(api)
+    if response.get('error', True):
+        print("Login failed!")
+        print(json.dumps(response, indent=2))
+        sys.exit(1)
+    if response.get('source') == 'login':
+        # On stderr so it never ends up in piped jsonl/csv output
+        print("Login successful!\n", file=sys.stderr)
+
+def get_mirrored_rows(args, grid):
+    """Return rows of `grid` from the local mirror if --offline/--max-age allow it
+    
+    Returns None when the caller should fetch live data instead.
+    """
+    if not args.offline and args.max_age is None:
+        return None
+    
+    mirror = get_local_mirror(get_base_url(args))
+    try:
+        age = mirror.age(grid)
+        if age is None:
+            if args.offline:
+                print("Error: No local mirror yet. Run 'tracsis sync' first.")
+                sys.exit(1)
+            return None
+        if args.offline or age <= args.max_age:
+            return mirror.rows(grid)
+        return None
+    finally:
+        mirror.close()
+
 def handle_login(args):
     """Handle the login command"""
-    api = get_api_instance()
+    api = get_api_instance(args)
     
     if not api.check_credentials():
         print("Error: Invalid or missing credentials in config.json")
@@ -50,6 +251,8 @@ def handle_login(args):
     
     # Show authentication status
     if not response.get('error', True) and api.is_authenticated():
+        with api.token_store.lock():
+            api.token_store.save_from_response(response)
         print(f"\n✓ Login successful! Tokens have been stored for subsequent API calls.")
         print(f"✓ Access token: {api.access_token[:20]}...")
         print(f"✓ Refresh token: {api.refresh_token}")
@@ -57,89 +260,130 @@ def handle_login(args):
         print(f"\n✗ Login failed!")
         sys.exit(1)
 
+def parse_where_arguments(expressions, aliases):
+    """Predicates of a command's --where options, exiting on a malformed one"""
+    from grid_filters import parse_where
+    try:
+        return parse_where(expressions, aliases)
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+def apply_row_fields(api, fields, columns, predicates, required):
+    """Have the API keep only the grid row fields a command outputs or filters on
+
+    Args:
+        fields: Fields given with --fields, if any
+        columns: (field, header) columns output by default; None outputs
+            whole rows, so nothing is dropped
+        predicates: --where predicates, checked on the rows after decoding
+        required: Fields the command reads itself
+    """
+    if not fields and columns is None:
+        api.row_fields = None
+        return
+    kept = list(fields or [field for field, _ in columns]) + [predicate.field for predicate in predicates] + list(required)
+    api.row_fields = list(dict.fromkeys(kept))
+
 def handle_task_list(args):
     """Handle the task list command"""
-    api = get_api_instance()
+    from output_formats import TASK_COLUMNS, TASK_FIELD_ALIASES, default_format, parse_fields, write_pages
+    from tracsis_api import TracsisAPIError
     
-    if not api.check_credentials():
-        print("Error: Invalid or missing credentials in config.json")
-        sys.exit(1)
-    # Check if user is logged in, if not, perform login first
-    if not api.is_authenticated():
-        print("Not authenticated. Performing login first...")
-        config = load_config()
-        user = config['credentials']['user']
-        password = config['credentials']['password']
-        
-        login_response = api.login(user, password)
-        
-        if login_response.get('error', True):
-            print("Login failed!")
-            print(json.dumps(login_response, indent=2))
-            sys.exit(1)
-        print("Login successful!\n")
-    
-    user_id = config['profile_data']['user_id']
     page = args.page
     per_page = args.per_page
-    
-    response = api.get_task_list(user_id, page, per_page)
-    
-    if response.get('error'):
+    where = parse_where_arguments(args.where, TASK_FIELD_ALIASES)
+    fields = parse_fields(args.fields, TASK_FIELD_ALIASES)
+    output_format = args.format or default_format()
+    
+    tasks = get_mirrored_rows(args, 'tasks')
+    if tasks is not None:
+        if where:
+            from grid_filters import filter_rows
+            tasks = filter_rows(tasks, where)
+        if not args.all:
+            tasks = tasks[(page - 1) * per_page:page * per_page]
+        pages = [tasks]
+    else:
+        api = get_api_instance(args)
+        apply_cache_options(api, args)
+        
+        require_credentials(api)
+        ensure_authenticated(api)
+        
+        user_id = get_user_id()
+        
+        columns = TASK_COLUMNS if output_format in ('cards', 'table') else None
+        apply_row_fields(api, fields, columns, where, ['hidden_task_id'])
+        
+        if args.all:
+            # Stream every page; the next page is fetched while this one is written
+            pages = api.iter_task_list_pages(user_id, per_page, args.jobs, where)
+        else:
+            response = api.get_task_list(user_id, page, per_page, where)
+            
+            if response.get('error'):
+                print('Error fetching tasks:')
+                print(json.dumps(response, indent=2))
+                sys.exit(1)
+
+            pages = [response.get('data', {}).get('items', [])]
+
+    try:
+        # Cards page through the tasks one at a time, like the web app's task view
+        write_pages(pages, output_format, fields=fields,
+                    columns=TASK_COLUMNS, pause=output_format == 'cards' and sys.stdout.isatty())
+    except TracsisAPIError as e:
         print('Error fetching tasks:')
-        print(json.dumps(response, indent=2))
+        print(json.dumps(e.response, indent=2))
         sys.exit(1)
 
-    # Get the tasks from response and reverse them to show latest first
-    tasks = response.get('data', {}).get('items', [])
-
-    # Clear screen and move cursor to top
-    print('\033[2J\033[H', end='')
-    
-    # Print each task in a formatted way
-    current_task = 0
-    while current_task < len(tasks):
-        task = tasks[current_task]
-        print('\033[1;33m' + '=' * 80 + '\033[0m')  # Yellow separator
-        print(f'\033[1;36mTask ID:\033[0m {task.get("hidden_task_id")}')
-        print(f'\033[1;36mTitle:\033[0m {task.get("task_title")}')
-        print(f'\033[1;36mProject:\033[0m {task.get("project_name")}')
-        print(f'\033[1;36mDelivery Date:\033[0m {task.get("formatted_date")}')
-        print(f'\033[1;36mEstimated Hours:\033[0m {task.get("estimated_hour")}')
-        print(f'\033[1;36mTask Type:\033[0m {task.get("module_name")}')
-        print('\033[1;33m' + '=' * 80 + '\033[0m\n')  # Yellow separator
-
-        # Wait for user input
-        user_input = input('Press Enter to continue, q to quit...')
-        if user_input.lower() == 'q':
-            break
-        
-        current_task += 1
-        if current_task < len(tasks):
-            # Clear screen for next task
-            print('\033[2J\033[H', end='')
+def print_task_logs(api, task_id, per_page, jobs=1, output_format=None, fields=None, where=None):
+    """Print every existing work log of a task
+    
+    Args:
+        output_format: One of output_formats.FORMATS (default: cards on a
+            terminal, a table otherwise)
+        fields: Comma-separated fields to output (default: every field)
+        where: --where expressions the logs must match
+    """
+    from output_formats import LOG_FIELD_ALIASES, default_format, parse_fields, write_pages
+    from table_render import LOG_COLUMNS
+    from tracsis_api import TracsisAPIError
+    output_format = output_format or default_format()
+    predicates = parse_where_arguments(where, LOG_FIELD_ALIASES)
+    fields = parse_fields(fields, LOG_FIELD_ALIASES)
+    columns = LOG_COLUMNS if output_format == 'table' else None
+    # Rows are matched to the task by task_id or hidden_task_id
+    apply_row_fields(api, fields, columns, predicates, ['task_id', 'hidden_task_id'])
+    try:
+        write_pages(api.iter_task_logs_pages(task_id, per_page, jobs, predicates), output_format,
+                    fields=fields, columns=columns)
+    except TracsisAPIError as e:
+        print('Error fetching task logs:')
+        print(json.dumps(e.response, indent=2))
+        sys.exit(1)
 
 def handle_task_logs(args):
     """Handle the task log command"""
-    api = get_api_instance()
-    
-    if not api.check_credentials():
-        print("Error: Invalid or missing credentials in config.json")
+    if args.task_id == 'import':
+        handle_import_logs(args)
+        return
+    try:
+        task_id = int(args.task_id)
+    except ValueError:
+        print(f"Error: Invalid task ID '{args.task_id}'")
         sys.exit(1)
-    # Check if user is logged in
-    if not api.is_authenticated():
-        print("Not authenticated. Performing login first...")
-        config = load_config()
-        user = config['credentials']['user']
-        password = config['credentials']['password']
-        
-        login_response = api.login(user, password)
-        
-        if login_response.get('error', True):
-            print("Login failed!")
-            print(json.dumps(login_response, indent=2))
-            sys.exit(1)
-        print("Login successful!\n")
+    
+    api = get_api_instance(args)
+    apply_cache_options(api, args)
+    
+    require_credentials(api)
+    ensure_authenticated(api)
+
+    if args.all:
+        print_task_logs(api, task_id, args.per_page, args.jobs, args.format, args.fields, args.where)
+        return
 
     # Example of setting a specific completer for work title
     def work_title_completer(text, state):
@@ -153,6 +397,8 @@ def handle_task_logs(args):
         matches = [i for i in options if i.startswith(text)]
         return matches[state] if state < len(matches) else None
 
+    import readline
+    
     # Save the original completer
     original_completer = readline.get_completer()
     readline.set_completer(work_title_completer)
@@ -170,7 +416,7 @@ def handle_task_logs(args):
     log_hour = float(input("log_hour> "))
 
     response = api.log_task_work(
-        task_id=args.task_id,
+        task_id=task_id,
         status=args.status,
         work_title=work_title,
         work_date=work_date,
@@ -189,239 +435,311 @@ def handle_task_logs(args):
         sys.exit(1)
 
 
-def setup_autocomplete():
-    """Setup auto-completion for the CLI"""
-    def completer(text, state):
-        # Define your completion options here
-        options = [
-            'login',
-            'task-list',
-            'task-logs',
-            # Add more commands as needed
-         ]
+def read_work_log_csv(path, default_task_id=None):
+    """Read a `title,date,log_hour[,task_id]` CSV (as written by genlog)
+    
+    Returns:
+        Tuple of (batches, errors) where batches maps (task_id, date) to a
+        list of work entries, in file order
+    """
+    import csv
+    
+    batches = {}
+    errors = []
+    with open(path, 'r', newline='') as f:
+        for line_no, row in enumerate(csv.DictReader(f), start=2):
+            task_id = (row.get('task_id') or '').strip() or default_task_id
+            title = (row.get('title') or '').strip()
+            date = (row.get('date') or '').strip()
+            try:
+                task_id = int(task_id)
+            except (TypeError, ValueError):
+                errors.append(f"line {line_no}: missing or invalid task_id (use --task-id or a task_id column)")
+                continue
+            try:
+                log_hour = float(row.get('log_hour') or '')
+            except ValueError:
+                errors.append(f"line {line_no}: invalid log_hour '{row.get('log_hour')}'")
+                continue
+            if not title or not date:
+                errors.append(f"line {line_no}: title and date are required")
+                continue
+            batches.setdefault((task_id, date), []).append({
+                'work_title': title,
+                'work_date': date,
+                'log_hour': log_hour
+            })
+    return batches, errors
+
+
+def handle_import_logs(args):
+    """Handle `logs import FILE`: submit a CSV of work logs, one request per task and date"""
+    if not args.file:
+        print("Error: Usage: tracsis logs import FILE [--task-id ID]")
+        sys.exit(1)
+    
+    try:
+        batches, errors = read_work_log_csv(args.file, args.default_task_id)
+    except FileNotFoundError:
+        print(f"Error: {args.file} not found")
+        sys.exit(1)
+    
+    if errors:
+        print(f"Error: {args.file} has invalid rows:")
+        for error in errors:
+            print(f"  {error}")
+        sys.exit(1)
+    
+    if not args.dry_run:
+        api = get_api_instance(args)
+        require_credentials(api)
+        ensure_authenticated(api)
+    
+    entries_total = 0
+    hours_total = 0.0
+    failed = []
+    for (task_id, date), entries in batches.items():
+        hours = sum(entry['log_hour'] for entry in entries)
+        entries_total += len(entries)
+        hours_total += hours
+        label = f"task {task_id} on {date}: {len(entries)} entries, {hours:g}h"
         
-        matches = [i for i in options if i.startswith(text)]
-        if state < len(matches):
-            return matches[state]
+        if args.dry_run:
+            print(f"[dry-run] {label}")
+            for entry in entries:
+                print(f"    - {entry['work_title']} ({entry['log_hour']:g}h)")
+            continue
+        
+        response = api.log_task_work_entries(task_id, args.status, entries)
+        if response.get('error'):
+            failed.append((task_id, date))
+            print(f"✗ {label}")
+            print(json.dumps(response, indent=2))
         else:
-            return None
+            print(f"✓ {label}")
+    
+    print(f"\n{len(batches)} requests, {entries_total} entries, {hours_total:g} hours"
+          f"{' (dry run, nothing submitted)' if args.dry_run else ''}")
+    if failed:
+        print(f"✗ {len(failed)} requests failed")
+        sys.exit(1)
 
-    readline.parse_and_bind('tab: complete')
-    readline.set_completer(completer)
+
+def read_task_ids(args):
+    """Collect task IDs from the command line and an optional --from-file"""
+    task_ids = list(args.task_ids)
+    if args.from_file:
+        try:
+            with open(args.from_file, 'r') as f:
+                for line in f:
+                    line = line.split('#', 1)[0].strip()
+                    if line:
+                        task_ids.append(int(line))
+        except FileNotFoundError:
+            print(f"Error: {args.from_file} not found")
+            sys.exit(1)
+        except ValueError as e:
+            print(f"Error: Invalid task ID in {args.from_file}: {e}")
+            sys.exit(1)
+    # Keep the given order but snap each task once
+    return list(dict.fromkeys(task_ids))
 
 
 def handle_snap(args):
-    """Handle the snap command with improved login verification"""
-    print("\nTaking screenshot...")
-    
-    api = get_api_instance()
-    
-    if not api.check_credentials():
-        print("Error: Invalid or missing credentials in config.json")
+    """Handle the snap command: screenshot one or many task pages
+    
+    Tasks whose log rows have not changed since their last snapshot are
+    skipped, so a browser is only started when something needs refreshing.
+    """
+    import time
+    from snapshots import (fetch_task_logs, is_current, render_task_snapshot, rows_fingerprint,
+                           save_fingerprint, screenshot_path, snap_tasks)
+    
+    task_ids = read_task_ids(args)
+    if not task_ids:
+        print("Error: Give at least one task ID or --from-file")
+        sys.exit(1)
+    if args.render == 'browser' and args.output_format != 'png':
+        print("Error: Browser snapshots are always PNG; use --render local for svg/html")
         sys.exit(1)
     
-    task_id = args.task_id
-    
-    config = load_config()
-    user = config['credentials']['user']
-    password = config['credentials']['password']
-    
-    # Import Selenium components
-    from selenium import webdriver
-    from selenium.webdriver.chrome.options import Options
-    from selenium.webdriver.common.by import By
-    from selenium.webdriver.support.ui import WebDriverWait
-    from selenium.webdriver.support import expected_conditions as EC
-    
-    print("\nOpening browser in headless mode...")
+    api = get_api_instance(args)
     
-    # Configure Chrome options for headless mode
-    chrome_options = Options()
-    chrome_options.add_argument("--headless")
-    chrome_options.add_argument("--no-sandbox")
-    chrome_options.add_argument("--disable-dev-shm-usage")
+    require_credentials(api)
+    ensure_authenticated(api)
     
-    # Initialize WebDriver
-    driver = webdriver.Chrome(options=chrome_options)
+    start = time.time()
     
-    try:
-        # First login to the web interface
-        driver.get("https://tracsis.apsissolutions.com/signin")
-        
-        email_field = WebDriverWait(driver, 10).until(
-            EC.element_to_be_clickable((By.CSS_SELECTOR, "input[id='email']"))  # Wait for clickable, not just present
-        )
-        # email_field.clear()  # Clear any existing text
-        
-        email_field.send_keys(user)
-
-        password_field = WebDriverWait(driver, 10).until(  # Wait for password field too
-            EC.element_to_be_clickable((By.CSS_SELECTOR, "input[id='password']"))
-        )
-        
-        # password_field.clear()  # Clear any existing text
-        password_field.send_keys(password)
-
-    # Add a small delay to ensure fields are populated
-        import time
-        time.sleep(1)
-
-        # Verify fields have values before submitting
-        if email_field.get_attribute('value') and password_field.get_attribute('value'):
-            submit_button = WebDriverWait(driver, 10).until(
-                EC.element_to_be_clickable((By.CSS_SELECTOR, "button[type='submit']"))
-            )
-            print('user:', email_field.get_attribute('value'))
-            print('password:', password_field.get_attribute('value'))
-            submit_button.click()
-            print("Login In Progress.....")
+    # Fingerprint each task's log rows to find the snapshots that are out of date
+    rows_by_task = fetch_task_logs(api, task_ids)
+    fingerprints = {task_id: rows_fingerprint(rows) for task_id, rows in rows_by_task.items()
+                    if rows is not None}
+    pending = []
+    for task_id in task_ids:
+        if not args.force and is_current(screenshot_path(task_id, args.output_format), fingerprints.get(task_id)):
+            print(f"- Task {task_id}: unchanged, skipped")
         else:
-            print("Fields not properly filled!")
-            print(f"Email field value: '{email_field.get_attribute('value')}'")
-            print(f"Password field value: '{password_field.get_attribute('value')}'")
-
-    
-        
-        WebDriverWait(driver, 10).until(
-            EC.url_matches(r"https://tracsis\.apsissolutions\.com/(?!signin).*")
-        )
-        print("Successfully navigated to post-login page")
-        # Now navigate to task page
-        task_url = f"https://tracsis.apsissolutions.com/pts/my-task/tasks/view/{task_id}?parent=my-task"
-        driver.get(task_url)
-        
-        # Verify we reached the task page
-        modal_close_button = WebDriverWait(driver, 25).until(
-                EC.element_to_be_clickable((By.CSS_SELECTOR, ".ant-table-container"))
-            )
-        
-        modal_close_button.click()
-        print("Successfully reached task page")
-            
-        # Final screenshot
-        element = driver.find_element(By.CSS_SELECTOR, ".ant-table")
-       
-
-        # Wait for changes to apply
-        import time
-        time.sleep(1)
-        screenshot_path = f"./snaps/task_{task_id}_screenshot.png"
-        element.screenshot(screenshot_path)
-        print(f"\nFinal screenshot saved as: {screenshot_path}")
+            pending.append(task_id)
+    skipped = len(task_ids) - len(pending)
+    
+    if not pending:
+        results = []
+    elif args.render == 'local':
+        # Render the log tables from API data, no browser involved
+        print(f"\nRendering {len(pending)} task snapshot(s) as {args.output_format}...")
+        results = (render_task_snapshot(api, task_id, args.output_format, rows_by_task.get(task_id))
+                   for task_id in pending)
+    else:
+        config = load_config()
+        user = config['credentials']['user']
+        password = config['credentials']['password']
         
-    except Exception as e:
-        print(f"Error during screenshot process: {str(e)}")
-        raise
-    finally:
-        driver.quit()
+        workers = max(1, min(args.workers, len(pending)))
+        print(f"\nTaking {len(pending)} screenshot(s) with {workers} headless browser(s)...")
+        results = snap_tasks(pending, user, password, workers, not args.fresh_login)
+    
+    failed = []
+    for result in results:
+        if result.error is None:
+            if result.task_id in fingerprints:
+                save_fingerprint(result.path, fingerprints[result.task_id])
+            print(f"✓ Task {result.task_id}: {result.path} ({result.seconds:.1f}s)")
+        else:
+            failed.append(result.task_id)
+            print(f"✗ Task {result.task_id}: {result.error} ({result.seconds:.1f}s)")
+    
+    refreshed = len(pending) - len(failed)
+    print(f"\n{refreshed} refreshed, {skipped} unchanged, {len(failed)} failed "
+          f"in {time.time() - start:.1f}s")
+    if failed:
+        print(f"Failed tasks: {' '.join(str(task_id) for task_id in failed)}")
+        sys.exit(1)
 
 
 def handle_gen_log(args):
     """Handle git commits command"""
     from datetime import datetime
-    import subprocess
-    import os
     import csv
+    import re
+    from git_scan import DEFAULT_IGNORES, ScanCache, discover_repos, match_author, scan_query, scan_repos
     
-    username = args.username
+    authors = ([args.username] if args.username else []) + (args.author or [])
+    if not authors:
+        print("Error: Give a git username or at least one --author")
+        sys.exit(1)
     path = os.path.abspath(args.path)  # Get absolute path
-    date = datetime.now().strftime('%Y-%m-%d')
+    since = args.since or datetime.now().strftime('%Y-%m-%d')
+    until = args.until or since
+    for value in (since, until):
+        try:
+            datetime.strptime(value, '%Y-%m-%d')
+        except ValueError:
+            print(f"Error: Invalid date '{value}'. Please use YYYY-MM-DD")
+            sys.exit(1)
     
-    print(f"Fetching git commits for user {username} in {path} on {date}...")
+    period = since if since == until else f"{since} to {until}"
+    print(f"Fetching git commits for {', '.join(authors)} in {path} on {period}...")
     
+    # Verify path exists
+    if not os.path.exists(path):
+        print(f"Error: Path {path} does not exist")
+        sys.exit(1)
+        
+    # Find all git repositories in subdirectories
+    repos = discover_repos(path, list(DEFAULT_IGNORES) + (args.ignore or []))
+    
+    if not repos:
+        print(f"No git repositories found in {path}")
+        return
+    
+    since_time = f"{since} 00:00:00"
+    until_time = f"{until} 23:59:59"
+    query = scan_query(authors, since_time, until_time)
+    
+    # When the CSVs of an earlier run of this query are all still in the current
+    # directory, only commits not written before are appended; otherwise
+    # everything is rescanned
+    cache = ScanCache()
+    appending = not args.full and cache.outputs_intact(query, os.getcwd())
+    if not appending:
+        cache.clear()
+    
+    # One CSV per author and day, opened when its first commit arrives
+    outputs = {}
+    
+    def csv_writer(author, day):
+        key = (author, day)
+        if key not in outputs:
+            safe_author = re.sub(r'[^\w.@-]+', '_', author)
+            filename = f"git_commits_{safe_author}_{day}.csv"
+            exists = os.path.exists(filename)
+            csvfile = open(filename, 'a' if appending and exists else 'w', newline='')
+            writer = csv.writer(csvfile)
+            if not (appending and exists):
+                writer.writerow(['title', 'date', 'log_hour'])
+            outputs[key] = [filename, csvfile, writer, 0]
+        return outputs[key]
+    
+    skipped = 0
     try:
-        # Verify path exists
-        if not os.path.exists(path):
-            print(f"Error: Path {path} does not exist")
-            sys.exit(1)
+        # Repositories are scanned in parallel, results arrive in repo order
+        for result in scan_repos(repos, authors, since_time, until_time, args.jobs, cache):
+            if result.skipped:
+                skipped += 1
+                continue
             
-        # Find all git repositories in subdirectories
-        find_cmd = f"find {path} -type d -name .git | sed 's/\.git$//'"
-        repos = subprocess.run(find_cmd, shell=True, check=True, capture_output=True, text=True).stdout.splitlines()
-        
-        if not repos:
-            print(f"No git repositories found in {path}")
-            return
+            print(f"\nCommits in {result.repo}:")
             
-        original_dir = os.getcwd()  # Save original directory
-        
-        # Create CSV file
-        csv_filename = f"git_commits_{username}_{date}.csv"
-        with open(csv_filename, 'w', newline='') as csvfile:
-            writer = csv.writer(csvfile)
-            writer.writerow(['title', 'date', 'log_hour'])
+            if result.error is not None:
+                print(f"Warning: Could not read repository at {result.repo}: {result.error}")
+                continue
             
-            for repo in repos:
-                repo_path = os.path.abspath(repo)  # Get absolute path
-                print(f"\nCommits in {repo_path}:")
-                
-                try:
-                    os.chdir(repo_path)
-                    
-                    # Get commits for this repository
-                    cmd = f"git log --all --author={username} --since='{date} 00:00:00' --until='{date} 23:59:59' --pretty=format:'%h - %an, %ar : %s'"
-                    result = subprocess.run(cmd, shell=True, check=True, capture_output=True, text=True)
-
-                    if len(result.stdout) > 0:
-                        commit_message = result.stdout
-                        print(commit_message)
-                        
-                        # Parse commit messages and write to CSV
-                        for line in commit_message.split('\n'):
-                            if ':' in line:
-                                title = line.split(':')[-1].strip()
-                                # Default to 1 hour for each commit
-                                writer.writerow([title, date, 1.0])
-                
-                except FileNotFoundError:
-                    print(f"Warning: Could not access repository at {repo_path}")
-                    continue
-                    
-                finally:
-                    # Always return to original directory
-                    os.chdir(original_dir)
-        
-        print(f"\nCSV file generated: {csv_filename}")
-        
-    except subprocess.CalledProcessError as e:
-        print(f"Error fetching git commits: {e.stderr}")
-        sys.exit(1)
+            for commit in result.commits:
+                print(f"{commit.hash[:7]} - {commit.author}, {commit.date} : {commit.subject}")
+                author = match_author(commit, authors) or authors[0]
+                day = commit.date[:10]
+                output = csv_writer(author, day)
+                # Default to 1 hour for each commit
+                output[2].writerow([commit.subject.strip(), day, 1.0])
+                output[3] += 1
+    finally:
+        for filename, csvfile, writer, count in outputs.values():
+            csvfile.close()
+    
+    cache.add_outputs(query, [os.path.abspath(output[0]) for output in outputs.values()])
+    cache.save()
+    
+    if skipped:
+        print(f"\n{skipped} of {len(repos)} repositories unchanged since the last run, skipped")
+    if not outputs:
+        print("\nNo new commits found")
+    for filename, csvfile, writer, count in outputs.values():
+        print(f"\nCSV file {'updated' if appending else 'generated'}: {filename} ({count} new commits)")
 
 
 def handle_create_task(args):
     """Handle the task creation command"""
-    api = get_api_instance()
+    api = get_api_instance(args)
+    apply_cache_options(api, args)
     
-    if not api.check_credentials():
-        print("Error: Invalid or missing credentials in config.json")
-        sys.exit(1)
-        
-    # Check if user is logged in
-    if not api.is_authenticated():
-        print("Not authenticated. Performing login first...")
-        config = load_config()
-        user = config['credentials']['user']
-        password = config['credentials']['password']
-        
-        login_response = api.login(user, password)
+    require_credentials(api)
         
-        if login_response.get('error', True):
-            print("Login failed!")
-            print(json.dumps(login_response, indent=2))
+    ensure_authenticated(api)
+    
+    # Get projects list, from the local mirror when allowed
+    project_rows = get_mirrored_rows(args, 'projects')
+    if project_rows is None:
+        projects_response = api.get_my_project_list()
+        if projects_response.get('error'):
+            print('Error fetching projects:')
+            print(json.dumps(projects_response, indent=2))
             sys.exit(1)
-        print("Login successful!\n")
-    
-    # Get projects list
-    projects_response = api.get_my_project_list()
-    if projects_response.get('error'):
-        print('Error fetching projects:')
-        print(json.dumps(projects_response, indent=2))
-        sys.exit(1)
+        project_rows = projects_response.get('data', {}).get('items', [])
     
     # Extract simplified project list
     projects = [
         {'project_id': p['hidden_project_id'], 'project_name': p['project_name']}
-        for p in projects_response.get('data', {}).get('items', [])
+        for p in project_rows
     ]
     
     # Display projects for selection
@@ -464,9 +782,7 @@ def handle_create_task(args):
         except ValueError:
             print("Invalid hours. Please enter a positive number")
     
-    # Get user_id from config
-    config = load_config()
-    user_id = config['profile_data']['user_id']
+    user_id = get_user_id()
     
     # Create task
     response = api.create_task(
@@ -486,6 +802,43 @@ def handle_create_task(args):
     print(json.dumps(response, indent=2))
 
 
+def handle_sync(args):
+    """Handle the sync command"""
+    from local_mirror import GRIDS
+    from tracsis_api import TracsisAPIError
+    
+    api = get_api_instance(args)
+    # Always fetch live data, refreshing cached responses on the way
+    api.refresh_cache = True
+    
+    require_credentials(api)
+    ensure_authenticated(api)
+    
+    user_id = get_user_id()
+    
+    streams = {
+        'tasks': lambda: api.iter_task_list(user_id, args.per_page, args.jobs),
+        'projects': lambda: api.iter_grid(GRIDS['projects'][0], args.per_page, jobs=args.jobs),
+        'logs': lambda: api.iter_grid(GRIDS['logs'][0], args.per_page, jobs=args.jobs),
+    }
+    
+    mirror = get_local_mirror(api.base_url)
+    try:
+        for grid in args.only or list(GRIDS):
+            try:
+                stats = mirror.sync(grid, streams[grid]())
+            except TracsisAPIError as e:
+                print(f'Error syncing {grid}:')
+                print(json.dumps(e.response, indent=2))
+                sys.exit(1)
+            print(f"✓ {grid}: {stats['added']} added, {stats['updated']} updated, "
+                  f"{stats['removed']} removed, {stats['unchanged']} unchanged")
+    finally:
+        mirror.close()
+    
+    print(f"\nLocal mirror updated: {mirror.path}")
+
+
 def handle_set_credentials(args):
     """Handle setting credentials and fetch profile data"""
     import getpass
@@ -493,20 +846,12 @@ def handle_set_credentials(args):
     import os
     import sys
 
-    api = get_api_instance()
+    api = get_api_instance(args)
     try:
         # Get user input
         email = input("Email: ").strip()
         password = getpass.getpass("Password: ").strip()
         
-        # Create config data structure
-        config_data = {
-            "credentials": {
-                "user": email,
-                "password": password
-            }
-        }
-        
         # Perform login to get tokens
         login_response = api.login(email, password)
         
@@ -518,24 +863,65 @@ def handle_set_credentials(args):
             
        
         profile_data = login_response['data']
-        config_data['profile_data'] = {
-                'user_id': profile_data['user_id'],
-                'user_code': profile_data['user_code'],
-                'user_name': profile_data['user_name']
-            }
-        config_data['secret'] = {
-            'access_token': profile_data['access_token'],
-            'refresh_token': profile_data['refresh_token']
-        }
         
-        # Save config
-        config_path = os.path.join(os.path.dirname(__file__), 'config.json')
-        with open(config_path, 'w') as f:
-            json.dump(config_data, f, indent=4)
+        # Merge into the existing config so base_url, transport settings and the
+        # tokens of other servers survive; the tokens go to this server's section
+        token_store = get_token_store(api.base_url)
+        with token_store.lock():
+            token_store.update_config({
+                'credentials': {
+                    'user': email,
+                    'password': password
+                },
+                'profile_data': {
+                    'user_id': profile_data['user_id'],
+                    'user_code': profile_data['user_code'],
+                    'user_name': profile_data['user_name']
+                }
+            })
+            token_store.save_from_response(login_response)
             
         print("✓ Credentials and profile data saved successfully!")
 
 
     except Exception as e:
         print(f"\n✗ Error saving credentials: {str(e)}")
-        sys.exit(1)
\ No newline at end of file
+        sys.exit(1)
+
+def handle_daemon(args):
+    """Handle the daemon command: start, stop or inspect the background daemon"""
+    import tracsis_daemon
+    
+    if args.action == 'run':
+        tracsis_daemon.run(args.idle_timeout)
+        return
+    
+    status = tracsis_daemon.request({'control': 'status'})
+    if args.action == 'status':
+        if status is None:
+            print("✗ Tracsis daemon is not running")
+            sys.exit(1)
+        print(f"✓ Tracsis daemon {status['pid']} listening on {tracsis_daemon.socket_path()}")
+        print(f"  Uptime: {status['uptime']:.0f}s, commands served: {status['commands_served']}, "
+              f"signed in: {'yes' if status['authenticated'] else 'no'}")
+    elif args.action == 'stop':
+        if status is None:
+            print("Tracsis daemon is not running")
+            return
+        tracsis_daemon.request({'control': 'stop'})
+        print(f"✓ Tracsis daemon {status['pid']} stopped")
+    elif args.action == 'start':
+        if status is not None:
+            print(f"Tracsis daemon {status['pid']} is already running")
+            return
+        status = tracsis_daemon.start(args.idle_timeout)
+        if status is None:
+            print(f"✗ Tracsis daemon did not start; see {tracsis_daemon.LOG_PATH}")
+            sys.exit(1)
+        print(f"✓ Tracsis daemon {status['pid']} started on {tracsis_daemon.socket_path()}")
+
+
+def handle_shell(args):
+    """Handle the shell command: run commands interactively in one process"""
+    from tracsis_shell import TracsisShell
+    TracsisShell(args).run()
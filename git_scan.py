@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Git Repository Scanner
+Finds git repositories under a path and collects commits from them in parallel
+"""
+
+import fnmatch
+import hashlib
+import json
+import os
+import re
+import subprocess
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+
+# Directory names never descended into while looking for repositories
+DEFAULT_IGNORES = ('node_modules', '.venv', 'venv', '__pycache__', '.tox', '.cache', 'build', 'dist')
+
+# git log format: hash, author name, author email, ISO author date, subject.
+# Used with -z, so fields and commits are all NUL separated.
+LOG_FORMAT = '%H%x00%an%x00%ae%x00%aI%x00%s'
+LOG_FIELDS = 5
+
+# A commit as read from git log
+Commit = namedtuple('Commit', ['hash', 'author', 'email', 'date', 'subject'])
+
+# Per-repository record of ref tips and already emitted commits
+SCAN_CACHE_PATH = os.path.join(os.path.dirname(__file__), '.tracsis_genlog_cache.json')
+
+# Result of scanning one repository; `skipped` means its refs were unchanged
+ScanResult = namedtuple('ScanResult', ['repo', 'commits', 'error', 'skipped'])
+
+
+def discover_repos(root: str, ignore: Sequence[str] = DEFAULT_IGNORES) -> List[str]:
+    """Find git repositories below `root` without shelling out
+
+    A directory containing `.git` (a directory, or a file for worktrees and
+    submodules) is a repository; the walk does not descend any further into
+    it. Other hidden directories and names matching an `ignore` glob are not
+    descended into, but a repository named like them (`build`, `.dotfiles`)
+    is still found.
+
+    Args:
+        root: Directory to search
+        ignore: Glob patterns of directory names to skip
+
+    Returns:
+        Sorted list of absolute repository paths
+    """
+    repos = []
+    stack = [os.path.abspath(root)]
+    while stack:
+        path = stack.pop()
+        if os.path.exists(os.path.join(path, '.git')):
+            repos.append(path)
+            continue
+        try:
+            entries = list(os.scandir(path))
+        except (PermissionError, FileNotFoundError, NotADirectoryError):
+            continue
+        for entry in entries:
+            if not entry.is_dir(follow_symlinks=False):
+                continue
+            if os.path.exists(os.path.join(entry.path, '.git')):
+                repos.append(entry.path)
+                continue
+            if entry.name.startswith('.') or any(fnmatch.fnmatch(entry.name, pattern) for pattern in ignore):
+                continue
+            stack.append(entry.path)
+    return sorted(repos)
+
+
+def git_dirs(repo: str) -> Tuple[str, str]:
+    """Resolve the git directory and common directory of a repository
+
+    Handles `.git` files (worktrees, submodules) that point elsewhere.
+
+    Returns:
+        (git_dir, common_dir); refs live in common_dir, HEAD in git_dir
+    """
+    git_dir = os.path.join(repo, '.git')
+    if os.path.isfile(git_dir):
+        with open(git_dir, 'r') as f:
+            content = f.read().strip()
+        if content.startswith('gitdir:'):
+            git_dir = os.path.normpath(os.path.join(repo, content[len('gitdir:'):].strip()))
+
+    common_dir = git_dir
+    commondir_file = os.path.join(git_dir, 'commondir')
+    if os.path.isfile(commondir_file):
+        with open(commondir_file, 'r') as f:
+            common_dir = os.path.normpath(os.path.join(git_dir, f.read().strip()))
+    return git_dir, common_dir
+
+
+def ref_fingerprint(repo: str) -> Optional[str]:
+    """Hash of every ref tip of a repository, read straight from .git
+
+    Covers HEAD, loose refs under refs/ and packed-refs, so any new commit on
+    any branch, tag or remote changes the fingerprint. No git process is run.
+
+    Returns:
+        Hex digest, or None if the refs could not be read
+    """
+    digest = hashlib.sha1()
+    try:
+        git_dir, common_dir = git_dirs(repo)
+        with open(os.path.join(git_dir, 'HEAD'), 'rb') as f:
+            digest.update(f.read())
+
+        packed_refs = os.path.join(common_dir, 'packed-refs')
+        if os.path.exists(packed_refs):
+            with open(packed_refs, 'rb') as f:
+                digest.update(f.read())
+
+        refs_root = os.path.join(common_dir, 'refs')
+        for dirpath, dirnames, filenames in os.walk(refs_root):
+            dirnames.sort()
+            for filename in sorted(filenames):
+                path = os.path.join(dirpath, filename)
+                digest.update(os.path.relpath(path, refs_root).encode())
+                with open(path, 'rb') as f:
+                    digest.update(f.read())
+    except OSError:
+        return None
+    return digest.hexdigest()
+
+
+class ScanCache:
+    """Remembers, per repository, its ref fingerprint and the commits already emitted
+
+    Entries are tied to a query (author and date range); a different query
+    starts the repository afresh.
+    """
+
+    def __init__(self, path: str = SCAN_CACHE_PATH):
+        self.path = path
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            data = {}
+        self.entries = data.get('repos', {})
+        self.outputs = data.get('outputs', {})
+
+    def lookup(self, repo: str, query: str) -> Dict:
+        """Cache entry of `repo` for `query` (empty if there is none)"""
+        entry = self.entries.get(repo)
+        if entry and entry.get('query') == query:
+            return entry
+        return {}
+
+    def update(self, repo: str, query: str, refs: Optional[str], emitted):
+        self.entries[repo] = {'query': query, 'refs': refs, 'emitted': sorted(emitted)}
+
+    def clear(self):
+        self.entries = {}
+        self.outputs = {}
+
+    def outputs_intact(self, query: str, directory: str) -> bool:
+        """Check that every file written for `query` so far is in `directory` and still exists
+
+        Emitted commits are only skipped when the files they went to are
+        still there to append to; a run from another directory, which writes
+        its own files, starts afresh.
+        """
+        if query not in self.outputs:
+            return False
+        directory = os.path.abspath(directory)
+        return all(os.path.dirname(path) == directory and os.path.exists(path)
+                   for path in self.outputs[query])
+
+    def add_outputs(self, query: str, paths):
+        self.outputs[query] = sorted(set(self.outputs.get(query, [])).union(paths))
+
+    def save(self):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({'repos': self.entries, 'outputs': self.outputs}, f)
+        os.replace(tmp_path, self.path)
+
+
+def scan_query(authors: Sequence[str], since: str, until: str) -> str:
+    """Key identifying one genlog query in the ScanCache"""
+    return json.dumps([list(authors), since, until])
+
+
+def repo_commits(repo: str, authors: Sequence[str], since: str, until: str) -> List[Commit]:
+    """List commits of one repository with `git -C`, without changing directory
+
+    All authors are matched by a single git log run (git ORs repeated
+    --author options).
+
+    Returns:
+        List of Commit tuples, newest first
+    """
+    cmd = ['git', '-C', repo, 'log', '--all', '-z', f'--since={since}', f'--until={until}',
+           f'--pretty=format:{LOG_FORMAT}']
+    cmd += [f'--author={author}' for author in authors]
+    result = subprocess.run(cmd, check=True, capture_output=True, text=True)
+    fields = result.stdout.split('\x00')
+    return [Commit(*fields[i:i + LOG_FIELDS])
+            for i in range(0, len(fields) - LOG_FIELDS + 1, LOG_FIELDS)]
+
+
+def match_author(commit: Commit, authors: Sequence[str]) -> Optional[str]:
+    """Return the first of `authors` matching a commit, like git's --author
+
+    git matches --author patterns against "Name <email>"; invalid regular
+    expressions fall back to a plain substring match.
+    """
+    ident = f"{commit.author} <{commit.email}>"
+    for author in authors:
+        try:
+            if re.search(author, ident):
+                return author
+        except re.error:
+            if author in ident:
+                return author
+    return None
+
+
+def scan_repos(repos: Sequence[str], authors: Sequence[str], since: str, until: str,
+               jobs: int = None, cache: Optional[ScanCache] = None) -> Iterator[ScanResult]:
+    """Run repo_commits over many repositories in a thread pool
+
+    Results are yielded in the order of `repos` regardless of which git
+    process finishes first, so the output is deterministic.
+
+    With a `cache`, repositories whose ref fingerprint is unchanged since the
+    last scan of the same query are skipped without running git, and only
+    commits not emitted before are returned. Call cache.save() afterwards.
+
+    Yields:
+        ScanResult per repository; `error` is None on success
+    """
+    query = scan_query(authors, since, until)
+
+    def scan(repo):
+        entry = cache.lookup(repo, query) if cache is not None else {}
+        refs = ref_fingerprint(repo) if cache is not None else None
+        if refs is not None and entry.get('refs') == refs:
+            return ScanResult(repo, [], None, True)
+        try:
+            commits = repo_commits(repo, authors, since, until)
+        except subprocess.CalledProcessError as e:
+            return ScanResult(repo, [], (e.stderr or '').strip(), False)
+        except OSError as e:
+            return ScanResult(repo, [], str(e), False)
+
+        if cache is None:
+            return ScanResult(repo, commits, None, False)
+        emitted = set(entry.get('emitted', []))
+        new_commits = [commit for commit in commits if commit.hash not in emitted]
+        cache.update(repo, query, refs, emitted.union(commit.hash for commit in commits))
+        return ScanResult(repo, new_commits, None, False)
+
+    with ThreadPoolExecutor(max_workers=jobs or min(32, (os.cpu_count() or 1) * 4)) as executor:
+        for result in executor.map(scan, repos):
+            yield result
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Tracsis Grid Filters
+--where expressions, compiled into grid search fields and checked against rows
+"""
+
+import re
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+
+OPERATORS = ['>=', '<=', '!=', '==', '=', '>', '<', '~']
+
+WHERE_PATTERN = re.compile(r'^\s*([A-Za-z_][\w.]*)\s*(' + '|'.join(re.escape(op) for op in OPERATORS) + r')\s*(.*?)\s*$')
+
+# Grid columns the server can search, per slug. Equality and substring
+# predicates go into `search_key` as {column: value}; comparisons go into
+# `search_data` as {"key", "operator", "value"} conditions.
+SERVER_SEARCH_FIELDS = {
+    'pts_my_tasks': {
+        'hidden_task_id', 'task_title', 'hidden_project_id', 'project_name', 'module_name',
+        'task_status', 'estimated_delivery_date', 'estimated_hour',
+    },
+    'pts_my_logs': {
+        'task_id', 'work_title', 'work_type', 'work_date', 'log_hour',
+    },
+}
+
+SEARCH_KEY_OPERATORS = ('=', '~')
+SEARCH_DATA_OPERATORS = ('>=', '<=', '>', '<')
+
+
+def as_number(value: Any) -> Optional[float]:
+    if isinstance(value, bool):
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class Predicate:
+    """One `field<op>value` condition
+
+    `=` and `!=` compare case-insensitively, `~` matches a case-insensitive
+    substring, and `<`, `<=`, `>`, `>=` compare numerically when both sides
+    are numbers and as text otherwise (so ISO dates compare correctly).
+    """
+
+    def __init__(self, field: str, op: str, value: str):
+        self.field = field
+        self.op = '=' if op == '==' else op
+        self.value = value
+        self.number = as_number(value)
+
+    def __repr__(self):
+        return f"{self.field}{self.op}{self.value}"
+
+    def matches(self, row: Dict[str, Any]) -> bool:
+        actual = row.get(self.field)
+        text = '' if actual is None else str(actual)
+        if self.op == '~':
+            return self.value.lower() in text.lower()
+
+        actual_number = as_number(actual)
+        if actual_number is not None and self.number is not None:
+            left, right = actual_number, self.number
+        else:
+            left, right = text.lower(), self.value.lower()
+        if self.op == '=':
+            return left == right
+        if self.op == '!=':
+            return left != right
+        if self.op == '>':
+            return left > right
+        if self.op == '>=':
+            return left >= right
+        if self.op == '<':
+            return left < right
+        return left <= right
+
+
+def parse_where(expressions: Optional[Sequence[str]], aliases: Optional[Dict[str, str]] = None) -> List[Predicate]:
+    """Parse --where expressions such as `project=Foo` or `delivery>=2026-10-01`
+
+    Args:
+        expressions: Expressions; all of them must hold for a row to match
+        aliases: Short field names, e.g. output_formats.TASK_FIELD_ALIASES
+
+    Raises:
+        ValueError: If an expression is not `field<op>value`
+    """
+    predicates = []
+    for expression in expressions or []:
+        match = WHERE_PATTERN.match(expression)
+        if not match:
+            raise ValueError(f"Invalid filter '{expression}', expected FIELD{'|'.join(OPERATORS)}VALUE")
+        field, op, value = match.groups()
+        predicates.append(Predicate((aliases or {}).get(field, field), op, value))
+    return predicates
+
+
+def compile_search(slug: str, predicates: Sequence[Predicate]) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """The `search_key` and `search_data` of a grid request narrowing it by `predicates`
+
+    Predicates on columns the server cannot search, and `!=`, are left out;
+    filter_rows still checks every predicate on the rows that come back.
+    """
+    searchable = SERVER_SEARCH_FIELDS.get(slug, set())
+    search_key = {}
+    search_data = []
+    for predicate in predicates:
+        if predicate.field not in searchable:
+            continue
+        if predicate.op in SEARCH_KEY_OPERATORS and predicate.field not in search_key:
+            search_key[predicate.field] = predicate.value
+        elif predicate.op in SEARCH_DATA_OPERATORS:
+            search_data.append({'key': predicate.field, 'operator': predicate.op, 'value': predicate.value})
+    return search_key, search_data
+
+
+def filter_rows(rows: Iterable[Dict[str, Any]], predicates: Sequence[Predicate]) -> List[Dict[str, Any]]:
+    """Rows matching every predicate"""
+    if not predicates:
+        return list(rows)
+    return [row for row in rows if all(predicate.matches(row) for predicate in predicates)]
+
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Tracsis JSON Decoding
+Decodes response bodies with orjson when it is installed and trims grid rows to the fields in use
+"""
+
+import json
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """Decode JSON, with orjson if available (about twice as fast on large grid pages)
+
+    Raises:
+        ValueError: If `data` is not valid JSON, or bytes that are not valid
+            UTF-8 (UnicodeDecodeError)
+    """
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            # orjson is stricter than the standard library (NaN, integers
+            # beyond 64 bits); let json decide whether the body is valid
+            pass
+    return json.loads(data)
+
+
+def project_rows(rows: List[Any], fields: Sequence[str]) -> List[Any]:
+    """Rows reduced to `fields`; fields a row lacks stay absent"""
+    return [{field: row[field] for field in fields if field in row} if isinstance(row, dict) else row
+            for row in rows]
+
+
+def project_grid_response(response: Dict[Any, Any], fields: Optional[Sequence[str]]) -> Dict[Any, Any]:
+    """A grid response whose data.items keep only `fields` (the response itself is left untouched)"""
+    data = response.get('data')
+    if not fields or not isinstance(data, dict) or not isinstance(data.get('items'), list):
+        return response
+    return {**response, 'data': {**data, 'items': project_rows(data['items'], fields)}}
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Tracsis Local Mirror
+Keeps a SQLite copy of the task, project and log grids for fast offline reads
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from typing import Dict, Any, List, Optional
+
+from json_decoding import loads
+
+
+MIRROR_DIR = os.path.dirname(__file__)
+
+# Mirrored grids: name -> (grid slug, candidate primary key fields)
+GRIDS = {
+    'tasks': ('pts_my_tasks', ('hidden_task_id', 'task_id', 'id')),
+    'projects': ('pts_active_projects', ('hidden_project_id', 'project_id', 'id')),
+    'logs': ('pts_my_logs', ('hidden_log_id', 'log_id', 'id')),
+}
+
+
+def mirror_path(base_url: str, user: str) -> str:
+    """Database of one API root and account, so neither is ever served the other's rows"""
+    digest = hashlib.sha1(json.dumps([base_url, user]).encode()).hexdigest()[:16]
+    return os.path.join(MIRROR_DIR, f"tracsis_mirror_{digest}.db")
+
+
+def row_hash(row: Dict[Any, Any]) -> str:
+    """Stable content hash of a grid row"""
+    return hashlib.sha1(json.dumps(row, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def row_key(row: Dict[Any, Any], key_fields) -> str:
+    """Primary key of a grid row, falling back to its content hash"""
+    for field in key_fields:
+        if row.get(field) is not None:
+            return str(row[field])
+    return row_hash(row)
+
+
+class LocalMirror:
+    """SQLite mirror of the Tracsis grids
+
+    Args:
+        path: Database file, see mirror_path
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript('''
+            CREATE TABLE IF NOT EXISTS grid_rows (
+                grid TEXT NOT NULL,
+                row_id TEXT NOT NULL,
+                row_hash TEXT NOT NULL,
+                position INTEGER NOT NULL,
+                data TEXT NOT NULL,
+                PRIMARY KEY (grid, row_id)
+            );
+            CREATE TABLE IF NOT EXISTS sync_state (
+                grid TEXT PRIMARY KEY,
+                synced_at REAL NOT NULL
+            );
+        ''')
+
+    def close(self):
+        self.conn.close()
+
+    def age(self, grid: str) -> Optional[float]:
+        """Seconds since `grid` was last synced, or None if it never was"""
+        row = self.conn.execute('SELECT synced_at FROM sync_state WHERE grid = ?', (grid,)).fetchone()
+        return time.time() - row[0] if row else None
+
+    def rows(self, grid: str) -> List[Dict[Any, Any]]:
+        """Mirrored rows of `grid` in the order the server returned them"""
+        cursor = self.conn.execute(
+            'SELECT data FROM grid_rows WHERE grid = ? ORDER BY position', (grid,))
+        return [loads(data) for (data,) in cursor]
+
+    def sync(self, grid: str, rows) -> Dict[str, int]:
+        """Bring `grid` in line with freshly streamed rows
+
+        Only rows whose content hash changed are rewritten, and rows that no
+        longer exist on the server are removed.
+
+        Args:
+            grid: Name of the grid, a key of GRIDS
+            rows: Iterable of grid rows as returned by the API
+
+        Returns:
+            Counts of added, updated, unchanged and removed rows
+        """
+        key_fields = GRIDS[grid][1]
+        known = dict(self.conn.execute(
+            'SELECT row_id, row_hash FROM grid_rows WHERE grid = ?', (grid,)))
+        stats = {'added': 0, 'updated': 0, 'unchanged': 0, 'removed': 0}
+        seen = set()
+
+        with self.conn:
+            for position, row in enumerate(rows):
+                row_id = row_key(row, key_fields)
+                digest = row_hash(row)
+                seen.add(row_id)
+                if known.get(row_id) == digest:
+                    stats['unchanged'] += 1
+                    self.conn.execute(
+                        'UPDATE grid_rows SET position = ? WHERE grid = ? AND row_id = ?',
+                        (position, grid, row_id))
+                    continue
+                stats['updated' if row_id in known else 'added'] += 1
+                self.conn.execute(
+                    'INSERT OR REPLACE INTO grid_rows (grid, row_id, row_hash, position, data) '
+                    'VALUES (?, ?, ?, ?, ?)',
+                    (grid, row_id, digest, position, json.dumps(row)))
+
+            removed = [row_id for row_id in known if row_id not in seen]
+            self.conn.executemany(
+                'DELETE FROM grid_rows WHERE grid = ? AND row_id = ?',
+                [(grid, row_id) for row_id in removed])
+            stats['removed'] = len(removed)
+
+            self.conn.execute(
+                'INSERT OR REPLACE INTO sync_state (grid, synced_at) VALUES (?, ?)',
+                (grid, time.time()))
+        return stats
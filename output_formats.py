@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Tracsis Output Formats
+Streams grid rows to stdout as cards, an aligned table, JSON lines, CSV or TSV
+"""
+
+import csv
+import json
+import os
+import sys
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+
+FORMATS = ['cards', 'table', 'jsonl', 'csv', 'tsv']
+
+# Summary columns of a task, as shown by cards and tables: (row field, header)
+TASK_COLUMNS = [
+    ('hidden_task_id', 'Task ID'),
+    ('task_title', 'Title'),
+    ('project_name', 'Project'),
+    ('formatted_date', 'Delivery Date'),
+    ('estimated_hour', 'Estimated Hours'),
+    ('module_name', 'Task Type'),
+]
+
+# Short names accepted by --fields
+TASK_FIELD_ALIASES = {
+    'id': 'hidden_task_id',
+    'title': 'task_title',
+    'project': 'project_name',
+    'delivery': 'estimated_delivery_date',
+    'hours': 'estimated_hour',
+    'type': 'module_name',
+    'status': 'task_status',
+}
+
+LOG_FIELD_ALIASES = {
+    'id': 'hidden_log_id',
+    'task': 'task_id',
+    'title': 'work_title',
+    'type': 'work_type',
+    'date': 'work_date',
+    'hours': 'log_hour',
+    'user': 'user_name',
+}
+
+# Table cells longer than this are cut short with an ellipsis
+MAX_CELL_WIDTH = 40
+
+YELLOW = '\033[1;33m'
+CYAN = '\033[1;36m'
+BOLD = '\033[1m'
+RESET = '\033[0m'
+CLEAR_SCREEN = '\033[2J\033[H'
+
+
+def use_color(stream) -> bool:
+    """Check whether ANSI escapes should be written to `stream`
+
+    Only terminals get them, and never when $NO_COLOR is set.
+    """
+    if os.environ.get('NO_COLOR'):
+        return False
+    isatty = getattr(stream, 'isatty', None)
+    return bool(isatty and isatty())
+
+
+def default_format(stream=None) -> str:
+    """Cards on a terminal, a table when the output is piped or redirected"""
+    isatty = getattr(stream or sys.stdout, 'isatty', None)
+    return 'cards' if isatty and isatty() else 'table'
+
+
+def parse_fields(value: Optional[str], aliases: Dict[str, str]) -> Optional[List[str]]:
+    """Field names from a comma-separated --fields value, with aliases resolved"""
+    if not value:
+        return None
+    fields = [name.strip() for name in value.split(',') if name.strip()]
+    return [aliases.get(name, name) for name in fields] or None
+
+
+def cell_text(value: Any) -> str:
+    if value is None:
+        return ''
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False)
+    return str(value)
+
+
+class RowWriter:
+    """Writes grid rows to a stream one page at a time, flushing after each page
+
+    Args:
+        output_format: One of FORMATS
+        fields: Fields to output; None writes whole rows in jsonl/csv/tsv and
+            `columns` in cards/table
+        columns: Default (field, header) columns of cards and tables; None
+            uses every field of the rows
+        stream: Output stream (default: sys.stdout)
+        pause: Wait for Enter after each card, q quits
+    """
+
+    def __init__(self, output_format: str, fields: Optional[Sequence[str]] = None,
+                 columns: Optional[Sequence[Tuple[str, str]]] = None, stream=None, pause: bool = False):
+        self.output_format = output_format
+        self.stream = stream or sys.stdout
+        self.color = use_color(self.stream)
+        self.pause = pause
+        self.count = 0
+        headers = dict(columns or [])
+        if fields:
+            self.columns = [(field, headers.get(field, field)) for field in fields]
+        else:
+            self.columns = list(columns) if columns else None
+        self.fields = list(fields) if fields else None
+        self._csv = None
+        self._widths = None
+
+    def write_page(self, rows: Sequence[Dict[str, Any]]) -> bool:
+        """Write a page of rows
+
+        Returns:
+            False if the reader asked to stop
+        """
+        if rows:
+            keep_going = getattr(self, f"_write_{self.output_format}")(rows)
+            self.stream.flush()
+            return keep_going
+        return True
+
+    def _write_jsonl(self, rows):
+        fields = self.fields
+        lines = []
+        for row in rows:
+            if fields:
+                row = {field: row.get(field) for field in fields}
+            lines.append(json.dumps(row, ensure_ascii=False, default=str))
+        self.stream.write('\n'.join(lines) + '\n')
+        self.count += len(rows)
+        return True
+
+    def _write_delimited(self, rows, delimiter):
+        if self._csv is None:
+            self._csv = csv.writer(self.stream, delimiter=delimiter, lineterminator='\n')
+            if self.fields is None:
+                self.fields = list(rows[0])
+            self._csv.writerow(self.fields)
+        for row in rows:
+            cells = [cell_text(row.get(field)) for field in self.fields]
+            if delimiter == '\t':
+                cells = [cell.replace('\t', ' ').replace('\r', ' ').replace('\n', ' ') for cell in cells]
+            self._csv.writerow(cells)
+        self.count += len(rows)
+        return True
+
+    def _write_csv(self, rows):
+        return self._write_delimited(rows, ',')
+
+    def _write_tsv(self, rows):
+        return self._write_delimited(rows, '\t')
+
+    def _write_table(self, rows):
+        if self._widths is None:
+            # Rows arrive a page at a time, so the first page sizes the columns
+            if self.columns is None:
+                self.columns = [(key, key) for key in rows[0]]
+            self._widths = [
+                min(MAX_CELL_WIDTH, max([len(header)] + [len(cell_text(row.get(field))) for row in rows]))
+                for field, header in self.columns
+            ]
+            header = '  '.join(header.ljust(width) for (_, header), width in zip(self.columns, self._widths)).rstrip()
+            rule = '  '.join('-' * width for width in self._widths)
+            if self.color:
+                header = BOLD + header + RESET
+            self.stream.write(f"{header}\n{rule}\n")
+
+        lines = []
+        for row in rows:
+            cells = []
+            for (field, _), width in zip(self.columns, self._widths):
+                text = cell_text(row.get(field)).replace('\n', ' ')
+                if len(text) > width:
+                    text = text[:width - 1] + '…'
+                cells.append(text.ljust(width))
+            lines.append('  '.join(cells).rstrip())
+        self.stream.write('\n'.join(lines) + '\n')
+        self.count += len(rows)
+        return True
+
+    def close(self):
+        """Finish the output once every page has been written"""
+        if self.output_format == 'cards' and self.count and not self.pause:
+            self.stream.write(self._separator() + '\n')
+            self.stream.flush()
+
+    def _separator(self):
+        return YELLOW + '=' * 80 + RESET if self.color else '=' * 80
+
+    def _write_cards(self, rows):
+        separator = self._separator()
+        label = CYAN + '{}:' + RESET if self.color else '{}:'
+        for row in rows:
+            columns = self.columns or [(key, key) for key in row]
+            if self.pause and self.color:
+                self.stream.write(CLEAR_SCREEN)
+            lines = [separator]
+            lines.extend(f"{label.format(header)} {cell_text(row.get(field))}" for field, header in columns)
+            self.stream.write('\n'.join(lines) + '\n')
+            self.count += 1
+            if self.pause:
+                self.stream.write(separator + '\n\n')
+                self.stream.flush()
+                try:
+                    if input('Press Enter to continue, q to quit...').lower() == 'q':
+                        return False
+                except EOFError:
+                    return False
+        return True
+
+
+def write_pages(pages: Iterable[Sequence[Dict[str, Any]]], output_format: str, **options) -> int:
+    """Stream pages of rows through a RowWriter (see its arguments)
+
+    Returns:
+        Number of rows written
+    """
+    writer = RowWriter(output_format, **options)
+    for rows in pages:
+        if not writer.write_page(rows):
+            break
+    writer.close()
+    return writer.count
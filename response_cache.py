@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Tracsis Response Cache
+Disk-backed TTL cache for slow-changing grid responses
+"""
+
+import hashlib
+import json
+import os
+import time
+from typing import Dict, Any, Optional, Tuple
+
+from json_decoding import loads
+
+
+CACHE_DIR = os.path.join(os.path.dirname(__file__), '.tracsis_cache')
+
+# Per-slug (ttl, max_stale) in seconds. Within `ttl` a cached response is
+# served as is; after that and up to `max_stale` it is served while a fresh
+# copy is fetched in the background. Grids not listed here are never cached.
+DEFAULT_TTLS = {
+    'pts_active_projects': (3600, 7 * 24 * 3600),
+}
+
+# Total size of the cache directory before least recently used entries are evicted
+DEFAULT_MAX_BYTES = 16 * 1024 * 1024
+
+
+class ResponseCache:
+    """LRU-bounded directory of cached API responses
+
+    Each entry is one JSON file named after a hash of the endpoint, payload and
+    namespace. File modification times double as the LRU clock.
+    """
+
+    def __init__(self, directory: str = CACHE_DIR, namespace: str = '',
+                 ttls: Optional[Dict[str, Tuple[int, int]]] = None,
+                 max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.namespace = namespace
+        self.ttls = DEFAULT_TTLS if ttls is None else ttls
+        self.max_bytes = max_bytes
+
+    def policy(self, slug: Optional[str]) -> Optional[Tuple[int, int]]:
+        """(ttl, max_stale) for a grid slug, or None if it is not cached"""
+        return self.ttls.get(slug)
+
+    def key(self, url: str, payload: Dict[Any, Any]) -> str:
+        """Cache key of a request"""
+        raw = json.dumps([self.namespace, url, payload], sort_keys=True)
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key: str) -> Optional[Tuple[Dict[Any, Any], float]]:
+        """Return (response, age in seconds) for a cached entry, or None"""
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                entry = loads(f.read())
+            # Mark as recently used
+            os.utime(path, None)
+        except (OSError, ValueError):
+            return None
+        return entry['response'], time.time() - entry['stored_at']
+
+    def set(self, key: str, response: Dict[Any, Any]):
+        """Store a response and evict old entries if the cache grew too large"""
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({'stored_at': time.time(), 'response': response}, f)
+        os.replace(tmp_path, path)
+        self.evict()
+
+    def evict(self):
+        """Remove least recently used entries until the cache fits in max_bytes"""
+        entries = []
+        total = 0
+        for entry in os.scandir(self.directory):
+            if not entry.name.endswith('.json'):
+                continue
+            stat = entry.stat()
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+            total += stat.st_size
+
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
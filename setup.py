@@ -6,12 +6,17 @@ setup(
     description="Command line tool for Tracsis API",
     author="Sajid Ahmed",
     author_email="abu.syeed@apsissolutions.com",
-    py_modules=["tracsis_cli", "tracsis_api", "command_handlers"],
+    py_modules=["tracsis_cli", "tracsis_api", "command_handlers", "token_store", "tracsis_async_api", "local_mirror", "response_cache", "git_scan", "snapshots", "table_render", "tracsis_daemon", "tracsis_shell", "transport", "tracing", "cassette", "output_formats", "grid_filters", "json_decoding"],
     install_requires=[
         "requests>=2.25.0",
         "selenium==4.15.0",
         "webdriver-manager==4.0.0"
     ],
+    extras_require={
+        "async": ["aiohttp>=3.8"],
+        "render": ["Pillow>=8.0"],
+        "fast": ["orjson>=3"],
+    },
     entry_points={
         "console_scripts": [
             "tracsis=tracsis_cli:main",
@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+"""
+Tracsis Task Snapshots
+Screenshots task pages of the Tracsis web app with headless Chrome
+"""
+
+import hashlib
+import json
+import os
+import queue
+import threading
+import time
+from collections import namedtuple
+from typing import Any, Dict, Iterator, Optional, Sequence
+
+from token_store import token_expiry
+
+
+WEB_URL = "https://tracsis.apsissolutions.com"
+SIGNIN_URL = f"{WEB_URL}/signin"
+TASK_URL = WEB_URL + "/pts/my-task/tasks/view/{task_id}?parent=my-task"
+SNAPS_DIR = "./snaps"
+
+# Cookies and localStorage of a signed-in browser, reused across runs
+SESSION_PATH = os.path.join(os.path.dirname(__file__), '.tracsis_browser_session.json')
+
+# Cookie fields accepted by WebDriver's add_cookie
+COOKIE_FIELDS = ('name', 'value', 'path', 'domain', 'secure', 'httpOnly', 'expiry', 'sameSite')
+
+# Log rows requested per page; one page normally holds every log of a task
+LOGS_PER_PAGE = 100
+
+_session_lock = threading.Lock()
+
+
+class SessionExpired(Exception):
+    """Raised when the web app sends a browser back to the sign-in page"""
+
+
+# Outcome of one task screenshot; `error` is None on success
+SnapResult = namedtuple('SnapResult', ['task_id', 'path', 'seconds', 'error'])
+
+
+def screenshot_path(task_id: int, extension: str = 'png') -> str:
+    return os.path.join(SNAPS_DIR, f"task_{task_id}_screenshot.{extension}")
+
+
+def fetch_task_logs(api, task_ids: Sequence[int], jobs: int = 4) -> Dict[int, Optional[list]]:
+    """Fetch the log rows of several tasks concurrently
+
+    Each task's logs are searched for on the server (see
+    TracsisAPI.iter_task_logs_pages), so this costs about one request per
+    task rather than a walk over the whole logs grid.
+
+    Returns:
+        Mapping of task ID to its rows, or to None if the request failed
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    from tracsis_api import TracsisAPIError
+
+    def fetch(task_id):
+        try:
+            return list(api.iter_task_logs(task_id, LOGS_PER_PAGE))
+        except TracsisAPIError:
+            return None
+
+    with ThreadPoolExecutor(max_workers=max(1, min(jobs, len(task_ids)))) as executor:
+        return dict(zip(task_ids, executor.map(fetch, task_ids)))
+
+
+def rows_fingerprint(rows: list) -> str:
+    """Content fingerprint of a task's log rows"""
+    return hashlib.sha1(json.dumps(rows, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def fingerprint_path(path: str) -> str:
+    """Sidecar file holding the fingerprint a snapshot was taken from"""
+    return f"{path}.sha1"
+
+
+def is_current(path: str, fingerprint: Optional[str]) -> bool:
+    """Check whether the snapshot at `path` was taken from data with this fingerprint"""
+    if fingerprint is None or not os.path.exists(path):
+        return False
+    try:
+        with open(fingerprint_path(path), 'r') as f:
+            return f.read().strip() == fingerprint
+    except FileNotFoundError:
+        return False
+
+
+def save_fingerprint(path: str, fingerprint: str):
+    with open(fingerprint_path(path), 'w') as f:
+        f.write(fingerprint)
+
+
+def render_task_snapshot(api, task_id: int, output_format: str = 'png',
+                         rows: Optional[list] = None) -> SnapResult:
+    """Render a task's log table from API data instead of screenshotting the web app
+
+    Args:
+        api: Authenticated TracsisAPI instance
+        task_id: Task to render
+        output_format: 'png', 'svg' or 'html'
+        rows: Log rows already fetched for the task, fetched here if None
+
+    Returns:
+        SnapResult for the task
+    """
+    from table_render import render_table
+    from tracsis_api import TracsisAPIError
+
+    os.makedirs(SNAPS_DIR, exist_ok=True)
+    start = time.time()
+    try:
+        if rows is None:
+            rows = list(api.iter_task_logs(task_id, LOGS_PER_PAGE))
+        path = screenshot_path(task_id, output_format)
+        render_table(rows, path, output_format, title=f"Task {task_id}")
+    except TracsisAPIError as e:
+        return SnapResult(task_id, None, time.time() - start, e.response.get('message', str(e)))
+    except (ImportError, OSError) as e:
+        return SnapResult(task_id, None, time.time() - start, str(e))
+    return SnapResult(task_id, path, time.time() - start, None)
+
+
+def new_driver():
+    """Start a headless Chrome WebDriver"""
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+
+    # Configure Chrome options for headless mode
+    chrome_options = Options()
+    chrome_options.add_argument("--headless")
+    chrome_options.add_argument("--no-sandbox")
+    chrome_options.add_argument("--disable-dev-shm-usage")
+
+    return webdriver.Chrome(options=chrome_options)
+
+
+def web_login(driver, user: str, password: str):
+    """Sign in to the web interface through its login form"""
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+
+    driver.get(SIGNIN_URL)
+
+    email_field = WebDriverWait(driver, 10).until(
+        EC.element_to_be_clickable((By.CSS_SELECTOR, "input[id='email']"))  # Wait for clickable, not just present
+    )
+    email_field.send_keys(user)
+
+    password_field = WebDriverWait(driver, 10).until(  # Wait for password field too
+        EC.element_to_be_clickable((By.CSS_SELECTOR, "input[id='password']"))
+    )
+    password_field.send_keys(password)
+
+    # Wait until both fields actually hold their values before submitting
+    WebDriverWait(driver, 5).until(
+        lambda d: email_field.get_attribute('value') and password_field.get_attribute('value'),
+        "Login form fields were not filled"
+    )
+
+    submit_button = WebDriverWait(driver, 10).until(
+        EC.element_to_be_clickable((By.CSS_SELECTOR, "button[type='submit']"))
+    )
+    submit_button.click()
+
+    WebDriverWait(driver, 10).until(
+        EC.url_matches(r"https://tracsis\.apsissolutions\.com/(?!signin).*")
+    )
+
+
+def load_session() -> Optional[Dict[str, Any]]:
+    """Saved browser session, or None if there is none or it has expired
+
+    Expiry is judged offline: every cookie expiry and every JWT found in
+    localStorage must still be in the future.
+    """
+    try:
+        with open(SESSION_PATH, 'r') as f:
+            state = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+    now = time.time()
+    for cookie in state.get('cookies', []):
+        if cookie.get('expiry') is not None and cookie['expiry'] <= now:
+            return None
+    for value in state.get('local_storage', {}).values():
+        if isinstance(value, str) and value.count('.') == 2 and token_expiry(value) <= now + 60:
+            return None
+    return state
+
+
+def save_session(driver):
+    """Store the cookies and localStorage of a signed-in browser"""
+    state = {
+        'cookies': driver.get_cookies(),
+        'local_storage': driver.execute_script("return Object.assign({}, window.localStorage);"),
+        'saved_at': time.time()
+    }
+    with _session_lock:
+        # The cookies and tokens sign in as the user, so only the owner may read them
+        tmp_path = f"{SESSION_PATH}.{threading.get_ident()}.tmp"
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w') as f:
+            json.dump(state, f)
+        os.chmod(tmp_path, 0o600)
+        os.replace(tmp_path, SESSION_PATH)
+
+
+def restore_session(driver) -> bool:
+    """Load a saved session into a fresh browser
+
+    Returns:
+        bool: True if a session was restored, False if a form login is needed
+    """
+    state = load_session()
+    if state is None:
+        return False
+
+    # Cookies and storage can only be set while on the web app's origin
+    driver.get(WEB_URL)
+    for cookie in state.get('cookies', []):
+        driver.add_cookie({key: cookie[key] for key in COOKIE_FIELDS if key in cookie})
+    driver.execute_script(
+        "for (const [key, value] of Object.entries(arguments[0])) { window.localStorage.setItem(key, value); }",
+        state.get('local_storage', {})
+    )
+    return True
+
+
+def sign_in(driver, user: str, password: str, reuse_session: bool = True) -> str:
+    """Sign a browser in, preferring the saved session over the login form
+
+    Returns:
+        'session' if a saved session was restored, 'form' after a form login
+    """
+    if reuse_session and restore_session(driver):
+        return 'session'
+    web_login(driver, user, password)
+    save_session(driver)
+    return 'form'
+
+
+def screenshot_task(driver, task_id: int) -> str:
+    """Open a task page in a signed-in driver and screenshot its log table
+
+    Returns:
+        Path of the saved PNG
+    """
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+
+    driver.get(TASK_URL.format(task_id=task_id))
+
+    # Wait for either the task table or a redirect to the sign-in page
+    WebDriverWait(driver, 25).until(
+        lambda d: '/signin' in d.current_url or d.find_elements(By.CSS_SELECTOR, ".ant-table-container")
+    )
+    if '/signin' in driver.current_url:
+        raise SessionExpired(f"Redirected to sign-in while opening task {task_id}")
+
+    # Verify we reached the task page
+    table_container = WebDriverWait(driver, 25).until(
+        EC.element_to_be_clickable((By.CSS_SELECTOR, ".ant-table-container"))
+    )
+    table_container.click()
+
+    # Wait for the table to finish loading instead of sleeping
+    WebDriverWait(driver, 25).until(
+        EC.invisibility_of_element_located((By.CSS_SELECTOR, ".ant-table .ant-spin-spinning"))
+    )
+    element = driver.find_element(By.CSS_SELECTOR, ".ant-table")
+
+    path = screenshot_path(task_id)
+    element.screenshot(path)
+    return path
+
+
+def snap_tasks(task_ids: Sequence[int], user: str, password: str,
+               workers: int = 1, reuse_session: bool = True) -> Iterator[SnapResult]:
+    """Screenshot many tasks with a pool of signed-in browsers
+
+    Each of the `workers` browsers is started and signed in once, then takes
+    task IDs from a shared queue until it is empty. Browsers reuse the saved
+    session when possible and fall back to the login form if the web app
+    rejects it.
+
+    Yields:
+        SnapResult per task, in completion order
+    """
+    os.makedirs(SNAPS_DIR, exist_ok=True)
+
+    tasks = queue.Queue()
+    for task_id in task_ids:
+        tasks.put(task_id)
+    results = queue.Queue()
+    workers = max(1, min(workers, len(task_ids)))
+
+    def worker():
+        driver = None
+        try:
+            driver = new_driver()
+            sign_in(driver, user, password, reuse_session)
+        except Exception as e:
+            # This browser is unusable; leave its share of the queue to the others
+            results.put(('failed', str(e)))
+            if driver is not None:
+                driver.quit()
+            return
+
+        try:
+            while True:
+                try:
+                    task_id = tasks.get_nowait()
+                except queue.Empty:
+                    break
+                start = time.time()
+                try:
+                    try:
+                        path = screenshot_task(driver, task_id)
+                    except SessionExpired:
+                        # Saved session was stale: sign in properly and retry once
+                        sign_in(driver, user, password, reuse_session=False)
+                        path = screenshot_task(driver, task_id)
+                    results.put(SnapResult(task_id, path, time.time() - start, None))
+                except Exception as e:
+                    results.put(SnapResult(task_id, None, time.time() - start, str(e)))
+        finally:
+            driver.quit()
+            results.put(('done', None))
+
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(workers)]
+    for thread in threads:
+        thread.start()
+
+    running = workers
+    last_error = None
+    while running:
+        result = results.get()
+        if isinstance(result, SnapResult):
+            yield result
+        else:
+            running -= 1
+            if result[0] == 'failed':
+                last_error = result[1]
+
+    # Tasks left over when every browser failed to start or sign in
+    while not tasks.empty():
+        yield SnapResult(tasks.get_nowait(), None, 0.0, last_error or "No browser available")
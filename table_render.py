@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Tracsis Table Rendering
+Renders task log rows as a table image without a browser
+"""
+
+import html
+from typing import Any, Dict, List, Sequence, Tuple
+
+
+# Preferred columns of a task log table: (row field, header)
+LOG_COLUMNS = [
+    ('work_date', 'Date'),
+    ('work_title', 'Title'),
+    ('work_type', 'Type'),
+    ('log_hour', 'Hours'),
+    ('user_name', 'User'),
+]
+
+# Colours and metrics modelled on the web app's ant-design table
+HEADER_BACKGROUND = '#fafafa'
+BORDER_COLOUR = '#f0f0f0'
+FONT_SIZE = 14
+CELL_PADDING_X = 16
+CELL_PADDING_Y = 12
+# Approximate character width used to size SVG columns
+CHAR_WIDTH = 8
+
+
+def table_columns(rows: Sequence[Dict[str, Any]]) -> List[Tuple[str, str]]:
+    """Columns to show: the preferred log columns present in the rows, or every field"""
+    present = set()
+    for row in rows:
+        present.update(row)
+    columns = [column for column in LOG_COLUMNS if column[0] in present]
+    if columns or not rows:
+        return columns or LOG_COLUMNS
+    return [(key, key.replace('_', ' ').title()) for key in rows[0]]
+
+
+def table_cells(rows: Sequence[Dict[str, Any]]) -> Tuple[List[str], List[List[str]]]:
+    """Header texts and cell texts of the table"""
+    columns = table_columns(rows)
+    headers = [header for _, header in columns]
+    cells = [['' if row.get(field) is None else str(row.get(field)) for field, _ in columns]
+             for row in rows]
+    return headers, cells
+
+
+def render_html(rows: Sequence[Dict[str, Any]], title: str) -> str:
+    headers, cells = table_cells(rows)
+    head = ''.join(f'<th>{html.escape(header)}</th>' for header in headers)
+    body = ''.join(
+        '<tr>' + ''.join(f'<td>{html.escape(cell)}</td>' for cell in row) + '</tr>'
+        for row in cells
+    )
+    return f"""<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>{html.escape(title)}</title>
+<style>
+  table {{ border-collapse: collapse; font: {FONT_SIZE}px -apple-system, "Segoe UI", Roboto, sans-serif; color: rgba(0, 0, 0, .85); }}
+  th {{ background: {HEADER_BACKGROUND}; font-weight: 500; text-align: left; }}
+  th, td {{ padding: {CELL_PADDING_Y}px {CELL_PADDING_X}px; border-bottom: 1px solid {BORDER_COLOUR}; }}
+</style>
+</head>
+<body>
+<table>
+<thead><tr>{head}</tr></thead>
+<tbody>{body}</tbody>
+</table>
+</body>
+</html>
+"""
+
+
+def _svg_layout(headers: List[str], cells: List[List[str]]) -> Tuple[List[int], int]:
+    widths = [len(header) for header in headers]
+    for row in cells:
+        widths = [max(width, len(cell)) for width, cell in zip(widths, row)]
+    widths = [width * CHAR_WIDTH + 2 * CELL_PADDING_X for width in widths]
+    return widths, FONT_SIZE + 2 * CELL_PADDING_Y
+
+
+def render_svg(rows: Sequence[Dict[str, Any]], title: str) -> str:
+    headers, cells = table_cells(rows)
+    widths, row_height = _svg_layout(headers, cells)
+    width = sum(widths)
+    height = row_height * (len(cells) + 1)
+
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+        f'font-family="sans-serif" font-size="{FONT_SIZE}">',
+        f'<title>{html.escape(title)}</title>',
+        f'<rect width="{width}" height="{height}" fill="#ffffff"/>',
+        f'<rect width="{width}" height="{row_height}" fill="{HEADER_BACKGROUND}"/>',
+    ]
+    for index, row in enumerate([headers] + cells):
+        y = index * row_height
+        x = 0
+        weight = ' font-weight="500"' if index == 0 else ''
+        for cell, column_width in zip(row, widths):
+            parts.append(
+                f'<text x="{x + CELL_PADDING_X}" y="{y + CELL_PADDING_Y + FONT_SIZE - 2}"{weight}>'
+                f'{html.escape(cell)}</text>'
+            )
+            x += column_width
+        parts.append(
+            f'<line x1="0" y1="{y + row_height - 0.5}" x2="{width}" y2="{y + row_height - 0.5}" '
+            f'stroke="{BORDER_COLOUR}"/>'
+        )
+    parts.append('</svg>')
+    return '\n'.join(parts)
+
+
+def render_png(rows: Sequence[Dict[str, Any]], path: str):
+    """Draw the table with Pillow and save it as a PNG"""
+    try:
+        from PIL import Image, ImageDraw, ImageFont
+    except ImportError:
+        raise ImportError("PNG rendering requires Pillow. Install it with: pip install 'tracsis-cli[render]' "
+                          "or use --output-format svg/html")
+
+    headers, cells = table_cells(rows)
+    try:
+        font = ImageFont.truetype('DejaVuSans.ttf', FONT_SIZE)
+    except OSError:
+        font = ImageFont.load_default()
+
+    measure = ImageDraw.Draw(Image.new('RGB', (1, 1)))
+
+    def text_width(text):
+        left, _, right, _ = measure.textbbox((0, 0), text, font=font)
+        return right - left
+
+    widths = [text_width(header) for header in headers]
+    for row in cells:
+        widths = [max(width, text_width(cell)) for width, cell in zip(widths, row)]
+    widths = [width + 2 * CELL_PADDING_X for width in widths]
+    row_height = FONT_SIZE + 2 * CELL_PADDING_Y
+    width = max(1, sum(widths))
+    height = row_height * (len(cells) + 1)
+
+    image = Image.new('RGB', (width, height), '#ffffff')
+    draw = ImageDraw.Draw(image)
+    draw.rectangle([0, 0, width, row_height - 1], fill=HEADER_BACKGROUND)
+    for index, row in enumerate([headers] + cells):
+        y = index * row_height
+        x = 0
+        for cell, column_width in zip(row, widths):
+            draw.text((x + CELL_PADDING_X, y + CELL_PADDING_Y), cell, fill='#262626', font=font)
+            x += column_width
+        draw.line([0, y + row_height - 1, width, y + row_height - 1], fill=BORDER_COLOUR)
+    image.save(path, 'PNG')
+
+
+def render_table(rows: Sequence[Dict[str, Any]], path: str, output_format: str, title: str = ''):
+    """Render rows to `path` as png, svg or html"""
+    if output_format == 'png':
+        render_png(rows, path)
+        return
+    content = render_svg(rows, title) if output_format == 'svg' else render_html(rows, title)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(content)
@@ -0,0 +1,86 @@
+"""
+Start-up regression tests: commands that never reach the network must not
+load the HTTP stack or readline, and must start quickly
+"""
+
+import json
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules only commands talking to the API (or prompting with completion) need
+HEAVY_MODULES = ('requests', 'urllib3', 'readline')
+
+# Seconds a command may take on top of a bare `python -c pass` on the same
+# machine; these commands add 0.01-0.05s, eagerly importing requests ~0.1s more
+STARTUP_OVERHEAD_BUDGET = 0.1
+
+# Runs the CLI in-process, then reports which heavy modules got imported
+PROBE = """
+import json, sys
+sys.path.insert(0, {root!r})
+sys.argv = ['tracsis'] + {argv!r}
+import tracsis_cli
+try:
+    tracsis_cli.main()
+except SystemExit:
+    pass
+sys.stderr.write('LOADED ' + json.dumps([name for name in {modules!r} if name in sys.modules]) + '\\n')
+"""
+
+
+# Commands run locally, never through a running daemon
+ENV = dict(os.environ, TRACSIS_NO_DAEMON='1')
+
+
+def best_of(runs, command, cwd):
+    """Fastest wall time in seconds of `runs` runs of `command`"""
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(command, cwd=cwd, env=ENV, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def loaded_modules(argv, cwd):
+    """HEAVY_MODULES imported by running the CLI with `argv` in a fresh interpreter"""
+    code = PROBE.format(root=ROOT, argv=list(argv), modules=HEAVY_MODULES)
+    result = subprocess.run([sys.executable, '-c', code], cwd=cwd, env=ENV,
+                            stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
+    lines = [line for line in result.stderr.splitlines() if line.startswith('LOADED ')]
+    assert lines, result.stderr
+    return json.loads(lines[-1][len('LOADED '):])
+
+
+@pytest.fixture
+def empty_repo_path(tmp_path):
+    path = tmp_path / 'repos'
+    path.mkdir()
+    return str(path)
+
+
+def test_help_does_not_load_heavy_modules(tmp_path):
+    assert loaded_modules(['--help'], str(tmp_path)) == []
+
+
+def test_genlog_does_not_load_heavy_modules(tmp_path, empty_repo_path):
+    assert loaded_modules(['genlog', 'alice', '--path', empty_repo_path], str(tmp_path)) == []
+
+
+@pytest.mark.parametrize('argv', [['--help'], ['genlog', 'alice', '--path', '{path}']])
+def test_startup_within_budget(tmp_path, empty_repo_path, argv):
+    argv = [arg.format(path=empty_repo_path) for arg in argv]
+    command = [sys.executable, os.path.join(ROOT, 'tracsis_cli.py')] + argv
+    # Warm the filesystem and bytecode caches, then compare the best of five
+    # runs with an interpreter doing nothing
+    best_of(1, command, str(tmp_path))
+    baseline = best_of(5, [sys.executable, '-c', 'pass'], str(tmp_path))
+    overhead = best_of(5, command, str(tmp_path)) - baseline
+    assert overhead < STARTUP_OVERHEAD_BUDGET, f"tracsis {' '.join(argv)} took {overhead:.3f}s over a bare interpreter"
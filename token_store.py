@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Tracsis Token Store
+Persists API tokens in config.json so CLI runs can reuse them instead of logging in
+"""
+
+import base64
+import json
+import os
+import time
+from contextlib import contextmanager
+from typing import Dict, Any, Optional
+
+
+CONFIG_PATH = os.path.join(os.path.dirname(__file__), 'config.json')
+
+# Refresh the access token when it is this close (in seconds) to expiring
+REFRESH_MARGIN = 60
+
+# Lifetime assumed for tokens that carry no expiry information
+DEFAULT_TOKEN_TTL = 3600
+
+
+def token_expiry(access_token: str, data: Optional[Dict[Any, Any]] = None) -> float:
+    """Work out when an access token expires
+
+    Uses the JWT `exp` claim when the token is a JWT, then an `expires_in`
+    value from the login response, and finally DEFAULT_TOKEN_TTL.
+
+    Args:
+        access_token: Access token returned by the API
+        data: The `data` section of the login/refresh response, if any
+
+    Returns:
+        Expiry as a unix timestamp
+    """
+    parts = (access_token or '').split('.')
+    if len(parts) == 3:
+        try:
+            segment = parts[1] + '=' * (-len(parts[1]) % 4)
+            claims = json.loads(base64.urlsafe_b64decode(segment))
+            if isinstance(claims, dict) and 'exp' in claims:
+                return float(claims['exp'])
+        except (ValueError, TypeError):
+            pass
+
+    if data and data.get('expires_in'):
+        try:
+            return time.time() + float(data['expires_in'])
+        except (ValueError, TypeError):
+            pass
+
+    return time.time() + DEFAULT_TOKEN_TTL
+
+
+class TokenStore:
+    """Load, save and renew the tokens kept in the `secret` section of config.json
+
+    Tokens for a server other than the default one (see --base-url) live in
+    their own section so they never replace the production tokens.
+    """
+
+    def __init__(self, config_path: str = CONFIG_PATH, section: str = 'secret'):
+        self.config_path = config_path
+        self.lock_path = f"{config_path}.lock"
+        self.section = section
+
+    @contextmanager
+    def lock(self):
+        """Hold an exclusive lock on the store across processes
+
+        Parallel `tracsis` runs serialise token renewal on this lock so that
+        only one of them talks to the auth endpoints.
+        """
+        with open(self.lock_path, 'a+') as f:
+            if os.name == 'nt':
+                import msvcrt
+                f.seek(0)
+                # LK_LOCK retries for ~10 seconds, keep trying until we own it
+                while True:
+                    try:
+                        msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                        break
+                    except OSError:
+                        continue
+                try:
+                    yield
+                finally:
+                    f.seek(0)
+                    msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                import fcntl
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+    def _read_config(self) -> Dict[Any, Any]:
+        try:
+            with open(self.config_path, 'r') as f:
+                config = json.load(f)
+            return config if isinstance(config, dict) else {}
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _write_config(self, config: Dict[Any, Any]):
+        # Write to a temporary file first so a crash never leaves a truncated config.
+        # config.json holds the password, so the file is only readable by its owner
+        tmp_path = f"{self.config_path}.tmp"
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w') as f:
+            json.dump(config, f, indent=4)
+        # A temporary file left behind by a crash keeps its old mode
+        os.chmod(tmp_path, 0o600)
+        os.replace(tmp_path, self.config_path)
+
+    def update_config(self, sections: Dict[Any, Any]):
+        """Replace some top-level sections of config.json, keeping the others
+
+        Call it under lock() like the token writes.
+        """
+        config = self._read_config()
+        config.update(sections)
+        self._write_config(config)
+
+    def load(self) -> Dict[Any, Any]:
+        """Return the saved `secret` section (may be empty)"""
+        secret = self._read_config().get(self.section)
+        return secret if isinstance(secret, dict) else {}
+
+    def save(self, access_token: str, refresh_token: str, expires_at: float):
+        """Persist tokens and their expiry into config.json"""
+        config = self._read_config()
+        config[self.section] = {
+            'access_token': access_token,
+            'refresh_token': refresh_token,
+            'expires_at': expires_at
+        }
+        self._write_config(config)
+
+    def save_from_response(self, response: Dict[Any, Any]) -> bool:
+        """Persist the tokens contained in a successful login/refresh response"""
+        if response.get('error', True):
+            return False
+        data = response.get('data') or {}
+        if not data.get('access_token') or not data.get('refresh_token'):
+            return False
+        self.save(data['access_token'], data['refresh_token'],
+                  token_expiry(data['access_token'], data))
+        return True
+
+    def is_fresh(self, secret: Dict[Any, Any]) -> bool:
+        """Check whether saved tokens can be used without renewing them"""
+        if not secret.get('access_token') or not secret.get('refresh_token'):
+            return False
+        expires_at = secret.get('expires_at')
+        if expires_at is None:
+            expires_at = token_expiry(secret['access_token'])
+        return time.time() < float(expires_at) - REFRESH_MARGIN
+
+    def authenticate(self, api) -> Dict[Any, Any]:
+        """Authenticate an API client using the cheapest available route
+
+        Tries, in order: the saved access token, a refresh with the saved
+        refresh token, and finally a password login with the saved credentials.
+
+        Args:
+            api: TracsisAPI instance to authenticate
+
+        Returns:
+            Dictionary with `error` False and the `source` used, or the error
+            response of the last failed attempt
+        """
+        secret = self.load()
+        if self.is_fresh(secret):
+            api.set_tokens(secret['access_token'], secret['refresh_token'])
+            return {"error": False, "source": "store"}
+
+        return self.renew(api, secret.get('access_token'))
+
+    def renew(self, api, stale_token: Optional[str]) -> Dict[Any, Any]:
+        """Replace a rejected or expired access token
+
+        Runs under the store lock. If another process already saved a newer
+        token while we were waiting, that token is adopted without calling the
+        API; otherwise the refresh token is tried before a password login.
+
+        Args:
+            api: TracsisAPI instance to authenticate
+            stale_token: Access token known to be expired or rejected
+
+        Returns:
+            Same contract as authenticate()
+        """
+        with self.lock():
+            secret = self.load()
+            if secret.get('access_token') != stale_token and self.is_fresh(secret):
+                api.set_tokens(secret['access_token'], secret['refresh_token'])
+                return {"error": False, "source": "store"}
+
+            if secret.get('refresh_token'):
+                response = api.refresh_tokens(secret['refresh_token'])
+                if self.save_from_response(response):
+                    return {"error": False, "source": "refresh"}
+
+            credentials = self._read_config().get('credentials') or {}
+            if not credentials.get('user') or not credentials.get('password'):
+                return {
+                    "error": True,
+                    "message": "No usable tokens and no credentials in config.json",
+                    "status_code": 401
+                }
+
+            response = api.login(credentials['user'], credentials['password'])
+            if self.save_from_response(response):
+                return {"error": False, "source": "login"}
+            return response
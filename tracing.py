@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Tracsis Tracing
+Per-request trace records (--trace) and a profile of where a command spends its time (--profile)
+"""
+
+import json
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+
+# Functions whose time counts as rendering output in the profile summary,
+# as (file name suffix, function name); an empty suffix matches builtins
+RENDER_FUNCTIONS = [
+    ('', 'print'),
+    ('table_render.py', 'render_table'),
+    ('output_formats.py', 'write_page'),
+]
+
+
+class RequestTracer:
+    """TracsisAPI request hook collecting trace records, optionally as JSONL
+
+    Records are dicts with an `event` of 'request' (one HTTP attempt, see
+    transport.attempt_record) or 'decode' (JSON decoding of a response).
+    Hooks run on whichever thread made the request, so writes are locked.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.records = []
+        self._lock = threading.Lock()
+        self._file = open(path, 'a', encoding='utf-8') if path else None
+
+    def __call__(self, record: Dict[str, Any]):
+        with self._lock:
+            self.records.append(record)
+            if self._file is not None:
+                self._file.write(json.dumps(record) + '\n')
+                self._file.flush()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def busy_seconds(intervals: Sequence[Tuple[float, float]]) -> float:
+    """Wall time covered by at least one of the (start, end) intervals"""
+    total = 0.0
+    current_start = current_end = None
+    for start, end in sorted(intervals):
+        if current_end is None or start > current_end:
+            if current_end is not None:
+                total += current_end - current_start
+            current_start, current_end = start, end
+        else:
+            current_end = max(current_end, end)
+    if current_end is not None:
+        total += current_end - current_start
+    return total
+
+
+def render_seconds(stats) -> float:
+    """Cumulative time of RENDER_FUNCTIONS in a pstats.Stats"""
+    total = 0.0
+    for (filename, _, function_name), (_, _, _, cumulative, _) in stats.stats.items():
+        for suffix, name in RENDER_FUNCTIONS:
+            builtin = filename == '~' and function_name == f'<built-in method builtins.{name}>'
+            if (not suffix and builtin) or (suffix and filename.endswith(suffix) and function_name == name):
+                total += cumulative
+    return total
+
+
+def print_profile_summary(wall: float, records: List[Dict[str, Any]], stats, top: int = 15):
+    """Print how a command's wall time splits between network, JSON decoding and rendering
+
+    Written to stderr, like the stats (see run_instrumented), so it stays out
+    of piped output.
+    """
+    attempts = [record for record in records if record['event'] == 'request']
+    decodes = [record for record in records if record['event'] == 'decode']
+    network = busy_seconds([(record['time'], record['time'] + record['total']) for record in attempts])
+    summed = sum(record['total'] for record in attempts)
+    retries = sum(1 for record in attempts if record['attempt'])
+    decoding = sum(record['seconds'] for record in decodes)
+    rendering = render_seconds(stats)
+    other = max(0.0, wall - network - decoding - rendering)
+
+    print("\n" + "=" * 60, file=sys.stderr)
+    print(f"Profile: {wall:.3f}s wall time", file=sys.stderr)
+    print(f"  Network      {network:8.3f}s  ({len(attempts)} requests, {retries} retries, "
+          f"{summed:.3f}s summed over concurrent requests)", file=sys.stderr)
+    print(f"  JSON decode  {decoding:8.3f}s  ({sum(record['bytes'] for record in decodes)} bytes)", file=sys.stderr)
+    print(f"  Rendering    {rendering:8.3f}s", file=sys.stderr)
+    print(f"  Other        {other:8.3f}s", file=sys.stderr)
+    print(f"\nTop {top} functions by cumulative time (main thread):", file=sys.stderr)
+    stats.sort_stats('cumulative').print_stats(top)
+
+
+def run_instrumented(args):
+    """Run a parsed command with --trace and/or --profile instrumentation
+
+    The tracers are handed to the API client through `args.request_tracers`
+    (see command_handlers.get_api_instance).
+    """
+    import transport
+
+    tracers = []
+    if args.trace:
+        tracers.append(RequestTracer(args.trace))
+    if args.profile:
+        tracers.append(RequestTracer())
+    args.request_tracers = tracers
+    transport.MEASURE_DNS = True
+
+    try:
+        if not args.profile:
+            args.func(args)
+            return
+
+        import cProfile
+        import pstats
+
+        profiler = cProfile.Profile()
+        start = time.perf_counter()
+        try:
+            profiler.runcall(args.func, args)
+        finally:
+            wall = time.perf_counter() - start
+            stats = pstats.Stats(profiler, stream=sys.stderr)
+            print_profile_summary(wall, tracers[-1].records, stats)
+    finally:
+        transport.MEASURE_DNS = False
+        for tracer in tracers:
+            tracer.close()
@@ -6,25 +6,180 @@ Handles all API interactions with the Tracsis backend
 
 import requests
 import json
-from typing import Dict, Any
+import math
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Iterator, List, Optional
+from urllib.parse import urlparse
 import os
 
+from grid_filters import Predicate, compile_search, filter_rows
+from json_decoding import loads, project_grid_response
+from transport import TransportSettings, mount_adapters, send_with_retries
+
+
+class TracsisAPIError(Exception):
+    """Raised by the streaming helpers when the API returns an error response"""
+
+    def __init__(self, response: Dict[Any, Any]):
+        super().__init__(response.get('message', 'Request failed'))
+        self.response = response
+
+
+def grid_last_page(data: Dict[Any, Any], per_page: int) -> Optional[int]:
+    """Read the last page number from a grid-data `data` section
+
+    Understands `last_page`/`total_pages` style fields as well as a `total`
+    row count, either at the top level or under `pagination`/`meta`.
+
+    Returns:
+        Last page number, or None if the response carries no pagination info
+    """
+    for section in (data, data.get('pagination'), data.get('meta')):
+        if not isinstance(section, dict):
+            continue
+        for key in ('last_page', 'total_pages', 'page_count'):
+            if section.get(key) is not None:
+                return int(section[key])
+        for key in ('total', 'total_count', 'total_rows'):
+            if section.get(key) is not None:
+                return max(1, math.ceil(int(section[key]) / per_page))
+    return None
+
+
+def grid_payload(slug: str, page: int, per_page: int, extra: Optional[Dict[Any, Any]] = None,
+                 where: Optional[List[Predicate]] = None) -> Dict[Any, Any]:
+    """Build the request body of a master-grid/grid-data call
+
+    Predicates in `where` that the grid can search are sent as its
+    search_key/search_data (see grid_filters.compile_search).
+    """
+    search_key, search_data = compile_search(slug, where or [])
+    return {
+        "slug": slug,
+        "extra": extra or {},
+        "page": page,
+        "per_page": per_page,
+        "search_key": search_key,
+        "search_data": search_data
+    }
+
+
+def task_list_extra(user_id: int) -> Dict[Any, Any]:
+    """Grid `extra` section restricting pts_my_tasks to one assignee"""
+    return {
+        "extra_condition": f"pts_tasks.assign_user_id = {user_id}"
+    }
+
+
+def is_log_of_task(row: Dict[Any, Any], task_id: int) -> bool:
+    """Check whether a pts_my_logs row belongs to a task (rows naming no task are kept)"""
+    row_task_id = row.get('task_id', row.get('hidden_task_id'))
+    return row_task_id is None or str(row_task_id) == str(task_id)
+
+
+def task_payload(title: str, user_id: int, delivery_date: str, estimated_hour: float,
+                 project_id: int, module_id: int) -> Dict[Any, Any]:
+    """Build the request body of a pts/task call"""
+    return {
+        "task_title": title,
+        "assign_user_id": user_id,
+        "estimated_delivery_date": delivery_date,
+        "estimated_hour": estimated_hour,
+        "project_id": project_id,
+        "module_id": module_id,
+        "sub_task":[]
+    }
+
+
+def work_log_payload(task_id: int, status: str, entries: List[Dict[str, Any]]) -> Dict[Any, Any]:
+    """Build the request body of a pts/task/log call
+
+    Args:
+        task_id: ID of the task to log work for
+        status: Task status ('i' for in_progress or 'c' for completed)
+        entries: Work entries with `work_title`, `work_date` and `log_hour`
+    """
+    # Convert status to task_status number
+    task_status = 3 if status == 'c' else 4
+
+    return {
+        "role_id": 2,
+        "task_status": task_status,
+        "task_id": task_id,
+        "work": [
+            {
+                "key": key,
+                "work_title": entry['work_title'],
+                "work_date": entry['work_date'],
+                "work_type": entry.get('work_type', "Development"),
+                "log_hour": entry['log_hour'],
+                "log_details": entry.get('log_details')
+            }
+            for key, entry in enumerate(entries)
+        ]
+    }
+
+
+def not_authenticated_response() -> Dict[Any, Any]:
+    """Error dictionary returned when a call needs tokens that are not set"""
+    return {
+        "error": True,
+        "message": "Not authenticated. Please login first.",
+        "status_code": 401
+    }
+
 
 class TracsisAPI:
     """Handle Tracsis API interactions"""
     
     BASE_URL = "https://tracsisapi.apsissolutions.com/api/v1"
-    
-    def __init__(self):
+
+    def __init__(self, transport: Optional[TransportSettings] = None, base_url: Optional[str] = None):
         self.session = requests.Session()
+        # API root, e.g. a local mock server; BASE_URL unless given
+        self.base_url = (base_url or self.BASE_URL).rstrip('/')
+        # Timeouts, retry policy and pool size of every request
+        self.transport = transport or TransportSettings()
+        self.pool_size = self.transport.pool_size
+        # Optional callable building the session's adapter from the pool size
+        # (see cassette.py); None mounts the default pooled adapter
+        self.adapter_factory = None
+        mount_adapters(self.session, self.pool_size)
         # Set default headers
         self.session.headers.update({
             'Content-Type': 'application/json',
-            'Accept': 'application/json'
+            'Accept': 'application/json',
+            'Accept-Encoding': 'gzip, deflate'
         })
         self.access_token = None
         self.refresh_token = None
+        # Optional TokenStore used to renew tokens when the server answers 401
+        self.token_store = None
+        self._auth_lock = threading.Lock()
+        # Optional ResponseCache for slow-changing grids; refresh_cache bypasses reads
+        self.cache = None
+        self.refresh_cache = False
+        # Callables invoked with (slug, response) for every successful grid page
+        self.grid_hooks = []
+        # Fields kept of each grid row once hooks have seen it; None keeps whole rows
+        self.row_fields = None
+        # Callables invoked with a trace record for every HTTP attempt and JSON decode
+        self.request_hooks = []
     
+    def set_base_url(self, base_url: str):
+        """Point the client at another API root, dropping tokens issued by the old one"""
+        self.base_url = base_url.rstrip('/')
+        self.clear_tokens()
+
+    def clear_tokens(self):
+        """Forget the authentication tokens"""
+        self.access_token = None
+        self.refresh_token = None
+        self.session.headers.pop('Authorization', None)
+
     def set_tokens(self, access_token: str, refresh_token: str):
         """Set authentication tokens"""
         self.access_token = access_token
@@ -34,52 +189,100 @@ class TracsisAPI:
             'Authorization': f'Bearer {access_token}',
         })
     
+    def set_pool_size(self, pool_size: int):
+        """Resize the session's connection pool so parallel requests reuse connections"""
+        self.pool_size = pool_size
+        mount_adapters(self.session, pool_size, self.adapter_factory)
+
+    def set_adapter_factory(self, factory):
+        """Send requests through adapters built by `factory(pool_size)`, or the default ones if None"""
+        self.adapter_factory = factory
+        mount_adapters(self.session, self.pool_size, factory)
+
+    def set_transport(self, transport: TransportSettings):
+        """Apply new timeouts and retry policy, remounting the pool only if its size changed"""
+        self.transport = transport
+        if transport.pool_size != self.pool_size:
+            self.set_pool_size(transport.pool_size)
+
     def is_authenticated(self) -> bool:
         """Check if API client is authenticated"""
-        print(f"Access Token: {self.access_token}")
-        print(f"Refresh Token: {self.refresh_token}")
         return self.access_token is not None and self.refresh_token is not None
-    
-    def login(self, user: str, password: str) -> Dict[Any, Any]:
+
+    def reauthenticate(self, stale_token: Optional[str]) -> bool:
+        """Renew tokens after the server rejected `stale_token`
+
+        Only one thread performs the renewal; threads that were waiting on the
+        lock find the token already replaced and simply retry with it.
+
+        Args:
+            stale_token: Access token that was used for the rejected request
+
+        Returns:
+            bool: True if a different, usable access token is now set
         """
-        Authenticate with the Tracsis API
-        
+        with self._auth_lock:
+            if self.access_token is not None and self.access_token != stale_token:
+                return True
+            if self.token_store is None:
+                return False
+            response = self.token_store.renew(self, stale_token)
+            return not response.get('error', True)
+
+    def _trace(self, record: Dict[str, Any]):
+        for hook in self.request_hooks:
+            hook(record)
+
+    def _send(self, url: str, payload: Dict[Any, Any], idempotent: bool = True) -> requests.Response:
+        """POST a JSON payload through the transport's timeouts and retry policy"""
+        on_attempt = self._trace if self.request_hooks else None
+        return send_with_retries(self.session, url, payload, self.transport, idempotent, on_attempt)
+
+    def _decode(self, response: requests.Response) -> Dict[Any, Any]:
+        """Decode a JSON response body, tracing the time it took"""
+        if not self.request_hooks:
+            return loads(response.content)
+        start = time.perf_counter()
+        try:
+            return loads(response.content)
+        finally:
+            self._trace({
+                'event': 'decode',
+                'time': time.time(),
+                'endpoint': urlparse(response.url).path,
+                'bytes': len(response.content),
+                'seconds': time.perf_counter() - start
+            })
+
+    def _post(self, url: str, payload: Dict[Any, Any], idempotent: bool = True,
+              authenticated: bool = True) -> Dict[Any, Any]:
+        """POST a JSON payload, re-authenticating once on 401
+
         Args:
-            user: Username for authentication
-            password: Password for authentication
-            
+            url: Endpoint URL
+            payload: JSON body
+            idempotent: False for requests with side effects (see send_with_retries)
+            authenticated: False for the auth endpoints themselves, which are
+                never retried with a renewed token
+
         Returns:
-            API response as dictionary
+            API response as dictionary, or an error dictionary
         """
-        url = f"{self.BASE_URL}/auth/login"
-        payload = {
-            "user": user,
-            "password": password
-        }
-        
-        print("\nLogin Request:")
-        print(f"URL: {url}")
-        print(f"Headers: {self.session.headers}")
-        print(f"Payload: {json.dumps(payload, indent=2)}\n")
-        
         try:
-            response = self.session.post(url, json=payload)
+            token = self.access_token
+            response = self._send(url, payload, idempotent)
+            if authenticated and response.status_code == 401 and self.reauthenticate(token):
+                response = self._send(url, payload, idempotent)
             response.raise_for_status()
-            result = response.json()
-            
-            if not result.get('error', True) and 'data' in result:
-                data = result['data']
-                if 'access_token' in data and 'refresh_token' in data:
-                    self.set_tokens(data['access_token'], data['refresh_token'])
-            
-            return result
+            return self._decode(response)
         except requests.exceptions.RequestException as e:
             return {
                 "error": True,
                 "message": f"Request failed: {str(e)}",
                 "status_code": getattr(e.response, 'status_code', None) if hasattr(e, 'response') else None
             }
-        except json.JSONDecodeError:
+        except ValueError:
+            # Also covers bodies that are not valid UTF-8, e.g. a proxy's error page
             return {
                 "error": True,
                 "message": "Invalid JSON response from server",
@@ -87,97 +290,249 @@ class TracsisAPI:
                 "raw_response": response.text
             }
     
-    def get_task_list(self, user_id: int, page: int = 1, per_page: int = 10) -> Dict[Any, Any]:
+    def login(self, user: str, password: str) -> Dict[Any, Any]:
         """
-        Get task list from the Tracsis API
+        Authenticate with the Tracsis API
         
         Args:
-            user_id: User ID to filter tasks
-            page: Page number for pagination (default: 1)
-            per_page: Number of items per page (default: 10)
+            user: Username for authentication
+            password: Password for authentication
             
         Returns:
             API response as dictionary
         """
-        if not self.is_authenticated():
-            return {
-                "error": True,
-                "message": "Not authenticated. Please login first.",
-                "status_code": 401
-            }
+        url = f"{self.base_url}/auth/login"
+        payload = {
+            "user": user,
+            "password": password
+        }
+        
+        result = self._post(url, payload, authenticated=False)
+        if not result.get('error', True) and 'data' in result:
+            data = result['data']
+            if 'access_token' in data and 'refresh_token' in data:
+                self.set_tokens(data['access_token'], data['refresh_token'])
         
-        url = f"{self.BASE_URL}/master-grid/grid-data"
+        return result
+
+    def refresh_tokens(self, refresh_token: str) -> Dict[Any, Any]:
+        """
+        Exchange a refresh token for a new pair of tokens
+
+        Args:
+            refresh_token: Refresh token from a previous login
+
+        Returns:
+            API response as dictionary
+        """
+        url = f"{self.base_url}/auth/refresh"
         payload = {
-            "slug": "pts_my_tasks",
-            "extra": {
-                "extra_condition": f"pts_tasks.assign_user_id = {user_id}"
-            },
-            "page": page,
-            "per_page": per_page,
-            "search_key": {},
-            "search_data": []
+            "refresh_token": refresh_token
         }
 
-        try:
-            response = self.session.post(url, json=payload)
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            return {
-                "error": True,
-                "message": f"Request failed: {str(e)}",
-                "status_code": getattr(e.response, 'status_code', None) if hasattr(e, 'response') else None
-            }
-        except json.JSONDecodeError:
-            return {
-                "error": True,
-                "message": "Invalid JSON response from server",
-                "status_code": response.status_code,
-                "raw_response": response.text
-            }
+        result = self._post(url, payload, authenticated=False)
+        if not result.get('error', True) and 'data' in result:
+            data = result['data']
+            if 'access_token' in data:
+                self.set_tokens(data['access_token'], data.get('refresh_token', refresh_token))
+                data.setdefault('refresh_token', refresh_token)
 
-    def get_my_project_list(self, page: int = 1, per_page: int = 10) -> Dict[Any, Any]:
+        return result
+
+    def _cached_post(self, url: str, payload: Dict[Any, Any]) -> Dict[Any, Any]:
+        """POST through the response cache when the grid slug has a cache policy
+
+        Fresh entries are returned directly. Stale entries still within their
+        max_stale window are returned immediately while a background thread
+        fetches a fresh copy (stale-while-revalidate).
         """
-        Get my project list from the Tracsis API
+        policy = self.cache.policy(payload.get('slug')) if self.cache is not None else None
+        if policy is None:
+            return self._post(url, payload)
+
+        ttl, max_stale = policy
+        key = self.cache.key(url, payload)
+        cached = None if self.refresh_cache else self.cache.get(key)
+        if cached is not None:
+            response, age = cached
+            if age <= ttl:
+                return response
+            if age <= max_stale:
+                # Not a daemon thread, so a short-lived CLI waits for it on exit
+                threading.Thread(target=self._revalidate, args=(url, payload, key)).start()
+                return response
+
+        return self._revalidate(url, payload, key)
+
+    def _revalidate(self, url: str, payload: Dict[Any, Any], key: str) -> Dict[Any, Any]:
+        response = self._post(url, payload)
+        if not response.get('error'):
+            self.cache.set(key, response)
+        return response
+
+    def get_grid_page(self, slug: str, page: int = 1, per_page: int = 10,
+                      extra: Optional[Dict[Any, Any]] = None,
+                      where: Optional[List[Predicate]] = None) -> Dict[Any, Any]:
+        """
+        Get one page of a master grid from the Tracsis API
+
+        Args:
+            slug: Grid slug, e.g. 'pts_my_tasks'
+            page: Page number for pagination (default: 1)
+            per_page: Number of items per page (default: 10)
+            extra: Grid `extra` section, e.g. an extra_condition
+            where: Filters the server applies where it can; the rows are
+                returned as the server sent them
+
+        Returns:
+            API response as dictionary, its rows reduced to row_fields if set
         """
         if not self.is_authenticated():
-            return {
-                "error": True,
-                "message": "Not authenticated. Please login first.",
-                "status_code": 401
-            }
-        
-        url = f"{self.BASE_URL}/master-grid/grid-data"
-        payload = {
-            "slug": "pts_active_projects",
-            "extra": {
-            },
-            "page": page,
-            "per_page": per_page,
-            "search_key": {},
-            "search_data": []
-        }
+            return not_authenticated_response()
+
+        url = f"{self.base_url}/master-grid/grid-data"
+        payload = grid_payload(slug, page, per_page, extra, where)
+
+        response = self._cached_post(url, payload)
+        if not response.get('error'):
+            for hook in self.grid_hooks:
+                hook(slug, response)
+            # The cache keeps whole rows; only what this command uses is passed on
+            response = project_grid_response(response, self.row_fields)
+        return response
+
+    def iter_grid(self, slug: str, per_page: int = 50, extra: Optional[Dict[Any, Any]] = None,
+                  start_page: int = 1, jobs: int = 1,
+                  where: Optional[List[Predicate]] = None) -> Iterator[Dict[Any, Any]]:
+        """Stream every row of a master grid (see iter_grid_pages)"""
+        for items in self.iter_grid_pages(slug, per_page, extra, start_page, jobs, where):
+            yield from items
+
+    def iter_grid_pages(self, slug: str, per_page: int = 50, extra: Optional[Dict[Any, Any]] = None,
+                        start_page: int = 1, jobs: int = 1,
+                        where: Optional[List[Predicate]] = None,
+                        search: Optional[List[Predicate]] = None) -> Iterator[List[Dict[Any, Any]]]:
+        """
+        Stream every page of a master grid
+
+        While the rows of one page are being consumed the next page is already
+        being fetched in the background. Once the first response reveals the
+        last page, up to `jobs` of the remaining pages are fetched concurrently
+        over the shared session; rows are still yielded in page order.
+        Iteration stops on the last page reported by the server, or on a
+        short/empty page when the response has no pagination info.
+
+        Args:
+            slug: Grid slug, e.g. 'pts_my_tasks'
+            per_page: Number of items per request (default: 50)
+            extra: Grid `extra` section, e.g. an extra_condition
+            start_page: First page to fetch (default: 1)
+            jobs: Number of pages fetched concurrently (default: 1)
+            where: Filters; the server narrows the pages by those it can
+                search and every row is checked against all of them
+            search: Filters only sent to the server, for the caller to check
+                the rows in its own way
+
+        Yields:
+            Lists of matching grid rows, one per page (possibly empty)
+
+        Raises:
+            TracsisAPIError: If a page request fails
+        """
+        jobs = max(1, jobs)
+        if jobs > self.pool_size:
+            self.set_pool_size(jobs)
 
+        sent = list(where or []) + list(search or []) or None
+        executor = ThreadPoolExecutor(max_workers=jobs)
+        pending = deque([executor.submit(self.get_grid_page, slug, start_page, per_page, extra, sent)])
+        next_page = start_page + 1
+        last_page = None
         try:
-            response = self.session.post(url, json=payload)
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            return {
-                "error": True,
-                "message": f"Request failed: {str(e)}",
-                "status_code": getattr(e.response, 'status_code', None) if hasattr(e, 'response') else None
-            }
-        except json.JSONDecodeError:
-            return {
-                "error": True,
-                "message": "Invalid JSON response from server",
-                "status_code": response.status_code,
-                "raw_response": response.text
-            }
+            while pending:
+                response = pending.popleft().result()
+                if response.get('error'):
+                    raise TracsisAPIError(response)
+
+                data = response.get('data') or {}
+                items = data.get('items') or []
+                if not items:
+                    break
+                if last_page is None:
+                    last_page = grid_last_page(data, per_page)
+
+                if last_page is not None:
+                    # Remaining pages are independent, keep `jobs` of them in flight
+                    while next_page <= last_page and len(pending) < jobs:
+                        pending.append(executor.submit(self.get_grid_page, slug, next_page, per_page, extra, sent))
+                        next_page += 1
+                elif len(items) >= per_page:
+                    pending.append(executor.submit(self.get_grid_page, slug, next_page, per_page, extra, sent))
+                    next_page += 1
+
+                yield filter_rows(items, where) if where else items
+        finally:
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=False)
+
+    def iter_task_list(self, user_id: int, per_page: int = 50, jobs: int = 1,
+                       where: Optional[List[Predicate]] = None) -> Iterator[Dict[Any, Any]]:
+        """Stream every task assigned to a user (see iter_grid)"""
+        return self.iter_grid("pts_my_tasks", per_page, task_list_extra(user_id), jobs=jobs, where=where)
+
+    def iter_task_list_pages(self, user_id: int, per_page: int = 50, jobs: int = 1,
+                             where: Optional[List[Predicate]] = None) -> Iterator[List[Dict[Any, Any]]]:
+        """Stream the tasks assigned to a user a page at a time (see iter_grid_pages)"""
+        return self.iter_grid_pages("pts_my_tasks", per_page, task_list_extra(user_id), jobs=jobs, where=where)
+
+    def iter_task_logs(self, task_id: int, per_page: int = 50, jobs: int = 1,
+                       where: Optional[List[Predicate]] = None) -> Iterator[Dict[Any, Any]]:
+        """Stream the work logs of a task (see iter_task_logs_pages)"""
+        for items in self.iter_task_logs_pages(task_id, per_page, jobs, where):
+            yield from items
+
+    def iter_task_logs_pages(self, task_id: int, per_page: int = 50, jobs: int = 1,
+                             where: Optional[List[Predicate]] = None) -> Iterator[List[Dict[Any, Any]]]:
+        """Stream the work logs of a task a page at a time (see iter_grid_pages)
+
+        The task is searched for on the server, so only its logs are
+        downloaded; rows are matched to it by task_id or hidden_task_id, and
+        those of other tasks are skipped.
+        """
+        task = [Predicate('task_id', '=', str(task_id))]
+        for items in self.iter_grid_pages("pts_my_logs", per_page, jobs=jobs, where=where, search=task):
+            yield [row for row in items if is_log_of_task(row, task_id)]
+
+    def get_task_list(self, user_id: int, page: int = 1, per_page: int = 10,
+                      where: Optional[List[Predicate]] = None) -> Dict[Any, Any]:
+        """
+        Get task list from the Tracsis API
+        
+        Args:
+            user_id: User ID to filter tasks
+            page: Page number for pagination (default: 1)
+            per_page: Number of items per page (default: 10)
+            where: Filters (see iter_grid_pages); the page's items are
+                reduced to the matching rows
+            
+        Returns:
+            API response as dictionary
+        """
+        response = self.get_grid_page("pts_my_tasks", page, per_page, task_list_extra(user_id), where)
+        if where and not response.get('error'):
+            # Copy rather than edit, the response may be shared with the cache
+            data = dict(response.get('data') or {})
+            data['items'] = filter_rows(data.get('items') or [], where)
+            response = {**response, 'data': data}
+        return response
+
+    def get_my_project_list(self, page: int = 1, per_page: int = 10) -> Dict[Any, Any]:
+        """
+        Get my project list from the Tracsis API
+        """
+        return self.get_grid_page("pts_active_projects", page, per_page)
 
-    
-    
     def get_task_logs(self, task_id: int, page: int = 1, per_page: int = 10) -> Dict[Any, Any]:
         """Get logs for a specific task from the Tracsis API
         
@@ -190,44 +545,12 @@ class TracsisAPI:
             API response as dictionary
         """
         if not self.is_authenticated():
-            return {
-                "error": True,
-                "message": "Not authenticated. Please login first.",
-                "status_code": 401
-            }
+            return not_authenticated_response()
         
-        url = f"{self.BASE_URL}/master-grid/grid-data"
-        payload = {
-            "slug": "pts_my_logs",
-            "extra": {},
-            "page": page,
-            "per_page": per_page,
-            "search_key": {},
-            "search_data": []
-        }
+        url = f"{self.base_url}/master-grid/grid-data"
+        payload = grid_payload("pts_my_logs", page, per_page)
 
-        print("\nTask Logs Request:")
-        print(f"URL: {url}")
-        print(f"Headers: {self.session.headers}")
-        print(f"Payload: {json.dumps(payload, indent=2)}\n")
-        
-        try:
-            response = self.session.post(url, json=payload)
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            return {
-                "error": True,
-                "message": f"Request failed: {str(e)}",
-                "status_code": getattr(e.response, 'status_code', None) if hasattr(e, 'response') else None
-            }
-        except json.JSONDecodeError:
-            return {
-                "error": True,
-                "message": "Invalid JSON response from server",
-                "status_code": response.status_code,
-                "raw_response": response.text
-            }
+        return self._post(url, payload)
     
     def create_task(self,title:str,user_id:int,delivery_date:str,estimated_hour:float,project_id:int,module_id:int=2305) -> Dict[Any, Any]:
         """
@@ -245,32 +568,11 @@ class TracsisAPI:
             API response as dictionary
         """
         if not self.is_authenticated():
-            return {
-                "error": True,
-                "message": "Not authenticated. Please login first.",
-                "status_code": 401
-            }
+            return not_authenticated_response()
         
-        url = f"{self.BASE_URL}/pts/task"
-        payload = {
-            "task_title": title,
-            "assign_user_id": user_id,
-            "estimated_delivery_date": delivery_date,
-            "estimated_hour": estimated_hour,
-            "project_id": project_id,
-            "module_id": module_id,
-            "sub_task":[]
-        }
-        try:
-            response = self.session.post(url, json=payload)
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            return {
-                "error": True,
-                "message": f"Request failed: {str(e)}",
-                "status_code": getattr(e.response, 'status_code', None) if hasattr(e, 'response') else None
-            }
+        url = f"{self.base_url}/pts/task"
+        payload = task_payload(title, user_id, delivery_date, estimated_hour, project_id, module_id)
+        return self._post(url, payload, idempotent=False)
 
 
     def log_task_work(self, task_id: int, status: str, work_title: str, work_date: str, log_hour: float) -> Dict[Any, Any]:
@@ -286,37 +588,24 @@ class TracsisAPI:
         Returns:
             API response as dictionary
         """
-        url = f"{self.BASE_URL}/pts/task/log"
+        entry = {"work_title": work_title, "work_date": work_date, "log_hour": log_hour}
+        return self.log_task_work_entries(task_id, status, [entry])
 
-        # Convert status to task_status number
-        task_status = 3 if status == 'c' else 4
+    def log_task_work_entries(self, task_id: int, status: str, entries: List[Dict[str, Any]]) -> Dict[Any, Any]:
+        """Log several pieces of work for a task in one request
 
-        payload = {
-            "role_id": 2,
-            "task_status": task_status,
-            "task_id": task_id,
-            "work": [
-                {
-                    "key": 0,
-                    "work_title": work_title,
-                    "work_date": work_date,
-                    "work_type": "Development",
-                    "log_hour": log_hour,
-                    "log_details": None
-                }
-            ]
-        }
+        Args:
+            task_id: ID of the task to log work for
+            status: Task status ('i' for in_progress or 'c' for completed)
+            entries: Work entries with `work_title`, `work_date` and `log_hour`
 
-        try:
-            response = self.session.post(url, json=payload)
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            return {
-                "error": True,
-                "message": f"Request failed: {str(e)}",
-                "status_code": getattr(e.response, 'status_code', None) if hasattr(e, 'response') else None
-            }
+        Returns:
+            API response as dictionary
+        """
+        url = f"{self.base_url}/pts/task/log"
+        payload = work_log_payload(task_id, status, entries)
+
+        return self._post(url, payload, idempotent=False)
 
     def check_credentials(self) -> bool:
         """Check if config.json has valid credentials structure
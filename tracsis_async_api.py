@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Tracsis Async API Client
+asyncio counterpart of TracsisAPI, built on aiohttp
+"""
+
+import asyncio
+from typing import Dict, Any, List, Optional
+
+from json_decoding import loads
+from tracsis_api import (
+    TracsisAPI,
+    grid_payload,
+    not_authenticated_response,
+    task_list_extra,
+    task_payload,
+    work_log_payload,
+)
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+
+class AsyncTracsisAPI:
+    """Handle Tracsis API interactions from an asyncio event loop
+
+    Every operation of TracsisAPI is available as a coroutine and returns the
+    same response/error dictionaries. All calls share one aiohttp connection
+    pool and at most `max_concurrency` requests are in flight at once.
+
+    Usage:
+        async with AsyncTracsisAPI() as api:
+            await api.login(user, password)
+            pages = await asyncio.gather(*(api.get_task_list(user_id, p) for p in range(1, 6)))
+    """
+
+    BASE_URL = TracsisAPI.BASE_URL
+
+    # Requests allowed in flight at once
+    DEFAULT_MAX_CONCURRENCY = 20
+
+    def __init__(self, max_concurrency: int = DEFAULT_MAX_CONCURRENCY, base_url: Optional[str] = None):
+        if aiohttp is None:
+            raise ImportError("AsyncTracsisAPI requires aiohttp. Install it with: pip install 'tracsis-cli[async]'")
+        self.max_concurrency = max_concurrency
+        self.base_url = (base_url or self.BASE_URL).rstrip('/')
+        self.access_token = None
+        self.refresh_token = None
+        # Optional TokenStore used to renew tokens when the server answers 401
+        self.token_store = None
+        self._session = None
+        # Created lazily so they bind to the running event loop
+        self._semaphore = None
+        self._auth_lock = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def close(self):
+        """Close the shared connection pool"""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def _get_session(self):
+        if self._session is None:
+            self._session = aiohttp.ClientSession(
+                headers={
+                    'Content-Type': 'application/json',
+                    'Accept': 'application/json'
+                },
+                connector=aiohttp.TCPConnector(limit=self.max_concurrency)
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._auth_lock = asyncio.Lock()
+        return self._session
+
+    def set_tokens(self, access_token: str, refresh_token: str):
+        """Set authentication tokens"""
+        self.access_token = access_token
+        self.refresh_token = refresh_token
+
+    def is_authenticated(self) -> bool:
+        """Check if API client is authenticated"""
+        return self.access_token is not None and self.refresh_token is not None
+
+    async def reauthenticate(self, stale_token: Optional[str]) -> bool:
+        """Renew tokens after the server rejected `stale_token`
+
+        Coroutines queue on one lock so only the first performs the renewal.
+        The renewal itself is TokenStore.renew() run in a worker thread, which
+        keeps the cross-process file lock of the synchronous client.
+
+        Returns:
+            bool: True if a different, usable access token is now set
+        """
+        async with self._auth_lock:
+            if self.access_token is not None and self.access_token != stale_token:
+                return True
+            if self.token_store is None:
+                return False
+            sync_api = TracsisAPI(base_url=self.base_url)
+            loop = asyncio.get_event_loop()
+            response = await loop.run_in_executor(None, self.token_store.renew, sync_api, stale_token)
+            if response.get('error', True):
+                return False
+            self.set_tokens(sync_api.access_token, sync_api.refresh_token)
+            return True
+
+    async def _post(self, url: str, payload: Dict[Any, Any], authenticated: bool = True) -> Dict[Any, Any]:
+        """POST a JSON payload, re-authenticating once on 401
+
+        Returns:
+            API response as dictionary, or an error dictionary
+        """
+        session = self._get_session()
+        for attempt in range(2):
+            token = self.access_token
+            headers = {'Authorization': f'Bearer {token}'} if authenticated and token else None
+            try:
+                async with self._semaphore:
+                    async with session.post(url, json=payload, headers=headers) as response:
+                        status_code = response.status
+                        text = await response.text()
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                return {
+                    "error": True,
+                    "message": f"Request failed: {str(e)}",
+                    "status_code": None
+                }
+
+            if status_code == 401 and authenticated and attempt == 0 and await self.reauthenticate(token):
+                continue
+            if status_code >= 400:
+                return {
+                    "error": True,
+                    "message": f"Request failed: {status_code} error for url: {url}",
+                    "status_code": status_code
+                }
+            try:
+                return loads(text)
+            except ValueError:
+                return {
+                    "error": True,
+                    "message": "Invalid JSON response from server",
+                    "status_code": status_code,
+                    "raw_response": text
+                }
+
+    def _store_tokens(self, result: Dict[Any, Any], refresh_token: Optional[str] = None):
+        if not result.get('error', True) and 'data' in result:
+            data = result['data']
+            if 'access_token' in data:
+                data.setdefault('refresh_token', refresh_token)
+                self.set_tokens(data['access_token'], data['refresh_token'])
+
+    async def login(self, user: str, password: str) -> Dict[Any, Any]:
+        """Authenticate with the Tracsis API (see TracsisAPI.login)"""
+        url = f"{self.base_url}/auth/login"
+        result = await self._post(url, {"user": user, "password": password}, authenticated=False)
+        self._store_tokens(result)
+        return result
+
+    async def refresh_tokens(self, refresh_token: str) -> Dict[Any, Any]:
+        """Exchange a refresh token for a new pair of tokens (see TracsisAPI.refresh_tokens)"""
+        url = f"{self.base_url}/auth/refresh"
+        result = await self._post(url, {"refresh_token": refresh_token}, authenticated=False)
+        self._store_tokens(result, refresh_token)
+        return result
+
+    async def get_grid_page(self, slug: str, page: int = 1, per_page: int = 10,
+                            extra: Optional[Dict[Any, Any]] = None) -> Dict[Any, Any]:
+        """Get one page of a master grid (see TracsisAPI.get_grid_page)"""
+        if not self.is_authenticated():
+            return not_authenticated_response()
+
+        url = f"{self.base_url}/master-grid/grid-data"
+        return await self._post(url, grid_payload(slug, page, per_page, extra))
+
+    async def get_task_list(self, user_id: int, page: int = 1, per_page: int = 10) -> Dict[Any, Any]:
+        """Get task list from the Tracsis API (see TracsisAPI.get_task_list)"""
+        return await self.get_grid_page("pts_my_tasks", page, per_page, task_list_extra(user_id))
+
+    async def get_my_project_list(self, page: int = 1, per_page: int = 10) -> Dict[Any, Any]:
+        """Get my project list from the Tracsis API"""
+        return await self.get_grid_page("pts_active_projects", page, per_page)
+
+    async def get_task_logs(self, task_id: int, page: int = 1, per_page: int = 10) -> Dict[Any, Any]:
+        """Get logs for a specific task from the Tracsis API (see TracsisAPI.get_task_logs)"""
+        return await self.get_grid_page("pts_my_logs", page, per_page)
+
+    async def create_task(self, title: str, user_id: int, delivery_date: str, estimated_hour: float,
+                          project_id: int, module_id: int = 2305) -> Dict[Any, Any]:
+        """Create a task in the Tracsis API (see TracsisAPI.create_task)"""
+        if not self.is_authenticated():
+            return not_authenticated_response()
+
+        url = f"{self.base_url}/pts/task"
+        payload = task_payload(title, user_id, delivery_date, estimated_hour, project_id, module_id)
+        return await self._post(url, payload)
+
+    async def log_task_work(self, task_id: int, status: str, work_title: str, work_date: str,
+                            log_hour: float) -> Dict[Any, Any]:
+        """Log work for a task (see TracsisAPI.log_task_work)"""
+        entry = {"work_title": work_title, "work_date": work_date, "log_hour": log_hour}
+        return await self.log_task_work_entries(task_id, status, [entry])
+
+    async def log_task_work_entries(self, task_id: int, status: str,
+                                    entries: List[Dict[str, Any]]) -> Dict[Any, Any]:
+        """Log several pieces of work for a task in one request (see TracsisAPI.log_task_work_entries)"""
+        url = f"{self.base_url}/pts/task/log"
+        return await self._post(url, work_log_payload(task_id, status, entries))
@@ -5,12 +5,45 @@ A CLI tool for interacting with the Tracsis API
 """
 
 import argparse
+import os
 import sys
-from command_handlers import handle_login, handle_task_list, handle_task_logs, handle_snap, handle_gen_log, handle_create_task,handle_set_credentials
+
+def lazy_handler(name):
+    """Return a handler that imports command_handlers only when its command runs
+    
+    Keeps `tracsis --help` and commands that never touch the network from
+    loading requests and the rest of the API client at startup.
+    """
+    def handler(args):
+        import command_handlers
+        return getattr(command_handlers, name)(args)
+    handler.__name__ = name
+    return handler
+
+def add_mirror_arguments(parser):
+    parser.add_argument('--offline', action='store_true', help='Read from the local mirror only (see the sync command)')
+    parser.add_argument('--max-age', type=int, default=None, help='Use the local mirror if it was synced within this many seconds')
+
+def add_cache_arguments(parser):
+    parser.add_argument('--no-cache', action='store_true', help='Do not read or write the response cache')
+    parser.add_argument('--refresh', action='store_true', help='Ignore cached responses and fetch fresh ones')
+
+def add_output_arguments(parser):
+    from output_formats import FORMATS
+    parser.add_argument('--format', choices=FORMATS, default=None, help='Output format, written as each page arrives (default: cards on a terminal, table otherwise)')
+    parser.add_argument('--fields', default=None, help='Comma-separated fields to output, e.g. id,title,project (default: all fields for jsonl/csv/tsv)')
+    parser.add_argument('--where', action='append', metavar='FIELD<OP>VALUE', help='Only rows matching this filter, e.g. project=Foo or delivery>=2026-10-01; OP is = != < <= > >= or ~ (contains). Repeatable, all must match')
+
+def add_transport_arguments(parser):
+    parser.add_argument('--timeout', dest='read_timeout', type=float, default=None, help='Seconds to wait for a response before giving up (default: 30, or "transport" in config.json)')
+    parser.add_argument('--connect-timeout', type=float, default=None, help='Seconds to wait for a connection (default: 5)')
+    parser.add_argument('--retries', type=int, default=None, help='Retries of requests failing with timeouts, connection errors or 429/5xx (default: 3)')
+    parser.add_argument('--pool-size', type=int, default=None, help='Connections kept open to the API server (default: 10)')
+    parser.add_argument('--base-url', default=None, help='API root to talk to, e.g. a local mock server (default: $TRACSIS_BASE_URL, "base_url" in config.json, or the Tracsis API)')
 
 def create_login_parser(subparsers):
     login_parser = subparsers.add_parser('login', help='Login to Tracsis API')
-    login_parser.set_defaults(func=handle_login)
+    login_parser.set_defaults(func=lazy_handler('handle_login'))
     return login_parser
 
 def tasks_list_parser(subparsers):
@@ -18,42 +51,97 @@ def tasks_list_parser(subparsers):
     task_parser.add_argument('--user-id', type=int, default=6010, help='User ID to filter tasks for (default: 6010)')
     task_parser.add_argument('--page', type=int, default=1, help='Page number for pagination (default: 1)')
     task_parser.add_argument('--per-page', type=int, default=10, help='Number of items per page (default: 10)')
-    task_parser.set_defaults(func=handle_task_list)
+    task_parser.add_argument('--all', action='store_true', help='Page through every task instead of a single page')
+    task_parser.add_argument('--jobs', type=int, default=1, help='Pages fetched concurrently with --all (default: 1)')
+    add_output_arguments(task_parser)
+    add_mirror_arguments(task_parser)
+    add_cache_arguments(task_parser)
+    task_parser.set_defaults(func=lazy_handler('handle_task_list'))
     return task_parser
 
 def create_logs_parser(subparsers):
-    logs_parser = subparsers.add_parser('logs', help='Create logs for a specific task')
-    logs_parser.add_argument('task_id', type=int, help='Task ID to fetch logs for')
+    logs_parser = subparsers.add_parser('logs', help='Create logs for a specific task, or import them from a CSV')
+    logs_parser.add_argument('task_id', type=str, help='Task ID to create logs for, or "import" to import a CSV')
+    logs_parser.add_argument('file', nargs='?', help='CSV file for "import" with title,date,log_hour[,task_id] columns')
+    logs_parser.add_argument('--task-id', dest='default_task_id', type=int, default=None, help='Task ID for imported rows without a task_id column')
+    logs_parser.add_argument('--status', choices=['i', 'c'], default='i', help='Task status to set: i (in progress) or c (completed) (default: i)')
+    logs_parser.add_argument('--dry-run', action='store_true', help='With import, show the requests without submitting them')
     logs_parser.add_argument('--page', type=int, default=1, help='Page number for pagination (default: 1)')
     logs_parser.add_argument('--per-page', type=int, default=10, help='Number of items per page (default: 10)')
-    logs_parser.set_defaults(func=handle_task_logs)
+    logs_parser.add_argument('--all', action='store_true', help='List every existing log of the task instead of creating one')
+    logs_parser.add_argument('--jobs', type=int, default=1, help='Pages fetched concurrently with --all (default: 1)')
+    add_output_arguments(logs_parser)
+    add_cache_arguments(logs_parser)
+    logs_parser.set_defaults(func=lazy_handler('handle_task_logs'))
     return logs_parser
 
 def create_snap_parser(subparsers):
-    snap_parser = subparsers.add_parser('snap', help='Take screenshot of task page in headless mode')
-    snap_parser.add_argument('task_id', type=int, help='Task ID to take screenshot for')
-    snap_parser.set_defaults(func=handle_snap)
+    snap_parser = subparsers.add_parser('snap', help='Take screenshots of task pages in headless mode')
+    snap_parser.add_argument('task_ids', type=int, nargs='*', help='Task IDs to take screenshots for')
+    snap_parser.add_argument('--from-file', type=str, default=None, help='File with one task ID per line')
+    snap_parser.add_argument('--workers', type=int, default=1, help='Browsers working in parallel (default: 1)')
+    snap_parser.add_argument('--fresh-login', action='store_true', help='Ignore the saved browser session and sign in through the login form')
+    snap_parser.add_argument('--render', choices=['browser', 'local'], default='browser', help='browser: screenshot the web app (default); local: render the log table from API data')
+    snap_parser.add_argument('--output-format', choices=['png', 'svg', 'html'], default='png', help='Snapshot format for --render local (default: png)')
+    snap_parser.add_argument('--force', action='store_true', help='Refresh snapshots even when the task logs are unchanged')
+    snap_parser.set_defaults(func=lazy_handler('handle_snap'))
     return snap_parser
 
 def create_genlog_parser(subparsers):
     git_parser = subparsers.add_parser('genlog', help='Fetch git commits for a username in specified path')
-    git_parser.add_argument('username', type=str, help='Git username to fetch commits for')
+    git_parser.add_argument('username', type=str, nargs='?', help='Git username to fetch commits for')
+    git_parser.add_argument('--author', action='append', help='Additional git author to fetch commits for (repeatable)')
+    git_parser.add_argument('--since', type=str, default=None, help='First day to include, YYYY-MM-DD (default: today)')
+    git_parser.add_argument('--until', type=str, default=None, help='Last day to include, YYYY-MM-DD (default: --since)')
     git_parser.add_argument('--path', type=str, default='./', help='Path to search for git repositories (default: current directory)')
-    git_parser.set_defaults(func=handle_gen_log)
+    git_parser.add_argument('--ignore', action='append', help='Glob of directory names to skip while searching (repeatable)')
+    git_parser.add_argument('--jobs', type=int, default=None, help='Repositories scanned in parallel (default: based on CPU count)')
+    git_parser.add_argument('--full', action='store_true', help='Rescan every repository and rewrite the CSV instead of appending new commits')
+    git_parser.set_defaults(func=lazy_handler('handle_gen_log'))
     return git_parser
 
 def create_set_creds_parser(subparsers):
     set_creds_parser = subparsers.add_parser('set-creds', help='Set credentials in config.json')
-    set_creds_parser.set_defaults(func=handle_set_credentials)
+    set_creds_parser.set_defaults(func=lazy_handler('handle_set_credentials'))
     return set_creds_parser
 
 def create_task_parser(subparsers):
     task_parser = subparsers.add_parser('create-task', help='Create a new task')
-    task_parser.set_defaults(func=handle_create_task)
+    add_mirror_arguments(task_parser)
+    add_cache_arguments(task_parser)
+    task_parser.set_defaults(func=lazy_handler('handle_create_task'))
     return task_parser
 
+def create_sync_parser(subparsers):
+    sync_parser = subparsers.add_parser('sync', help='Update the local mirror of tasks, projects and logs')
+    sync_parser.add_argument('--only', action='append', choices=['tasks', 'projects', 'logs'], help='Grid to sync (repeatable, default: all)')
+    sync_parser.add_argument('--per-page', type=int, default=100, help='Number of items per request (default: 100)')
+    sync_parser.add_argument('--jobs', type=int, default=4, help='Pages fetched concurrently (default: 4)')
+    sync_parser.set_defaults(func=lazy_handler('handle_sync'))
+    return sync_parser
+
+def create_daemon_parser(subparsers):
+    daemon_parser = subparsers.add_parser('daemon', help='Run commands through a background process that stays signed in')
+    daemon_parser.add_argument('action', choices=['start', 'stop', 'status', 'run'], help='start/stop the background daemon, show its status, or run it in the foreground')
+    daemon_parser.add_argument('--idle-timeout', type=int, default=3600, help='Seconds without commands before the daemon exits (default: 3600)')
+    daemon_parser.set_defaults(func=lazy_handler('handle_daemon'))
+    return daemon_parser
+
+def create_shell_parser(subparsers):
+    shell_parser = subparsers.add_parser('shell', help='Interactive shell that keeps the API session signed in')
+    shell_parser.set_defaults(func=lazy_handler('handle_shell'))
+    return shell_parser
+
 def setup_parsers():
     parser = argparse.ArgumentParser(description='Tracsis CLI Tool', prog='tracsis')
+    parser.add_argument('--no-daemon', action='store_true', help='Run the command in this process even if the daemon is running')
+    add_transport_arguments(parser)
+    parser.add_argument('--trace', metavar='FILE', default=None, help='Append a JSON line per API request (timings, status, bytes, retries) to FILE')
+    parser.add_argument('--profile', action='store_true', help='Profile the command and print where its time went')
+    cassette_group = parser.add_mutually_exclusive_group()
+    cassette_group.add_argument('--record', metavar='FILE', default=None, help='Record API requests and responses, tokens and passwords scrubbed, to a cassette FILE')
+    cassette_group.add_argument('--replay', metavar='FILE', default=None, help='Answer API requests from a cassette FILE instead of the network')
+    parser.add_argument('--replay-speed', type=float, default=0.0, help='Multiplier of recorded latencies when replaying (default: 0, no delay; 1 reproduces them)')
     subparsers = parser.add_subparsers(dest='command', help='Available commands')
     
     create_login_parser(subparsers)
@@ -63,9 +151,23 @@ def setup_parsers():
     create_genlog_parser(subparsers)
     create_set_creds_parser(subparsers)
     create_task_parser(subparsers)  # Add this line
+    create_sync_parser(subparsers)
+    create_daemon_parser(subparsers)
+    create_shell_parser(subparsers)
     
     return parser
 
+def run_command(args):
+    """Dispatch a parsed command, instrumented when --trace/--profile are given
+
+    The shell passes its --trace/--profile on to each command it runs instead.
+    """
+    if (args.trace or args.profile) and args.command != 'shell':
+        from tracing import run_instrumented
+        run_instrumented(args)
+    else:
+        args.func(args)
+
 def main():
     """Main entry point for the CLI"""
     parser = setup_parsers()
@@ -75,7 +177,25 @@ def main():
         parser.print_help()
         sys.exit(1)
     
-    args.func(args)
+    # Hand the command to the daemon when one is running; instrumented and
+    # cassette runs stay local
+    local = args.trace or args.profile or args.record or args.replay
+    try:
+        if not args.no_daemon and not local and not os.environ.get('TRACSIS_NO_DAEMON'):
+            import tracsis_daemon
+            if args.command in tracsis_daemon.FORWARDED_COMMANDS:
+                code = tracsis_daemon.forward(sys.argv[1:])
+                if code is not None:
+                    sys.exit(code)
+        
+        run_command(args)
+    except BrokenPipeError:
+        # The reader went away, e.g. `tracsis tasks --all --format jsonl | head`:
+        # stop fetching pages and exit quietly. Output flushed at interpreter
+        # exit would fail again, so point stdout at /dev/null first.
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        sys.exit(1)
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,372 @@
+#!/usr/bin/env python3
+"""
+Tracsis Daemon
+Background process holding a signed-in API client, and the thin client that forwards commands to it
+"""
+
+import json
+import os
+import socket
+import socketserver
+import struct
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+
+def socket_directory() -> str:
+    """Directory only this user can enter, holding the daemon's socket
+
+    $XDG_RUNTIME_DIR is private already; without it a 0700 directory of our
+    own is made in the shared temporary directory.
+    """
+    runtime = os.environ.get('XDG_RUNTIME_DIR')
+    if runtime:
+        return runtime
+    directory = os.path.join(tempfile.gettempdir(), f"tracsis-{os.getuid()}")
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    return directory
+
+
+def socket_path() -> str:
+    """Per-user Unix socket the daemon listens on"""
+    return os.path.join(socket_directory(), f"tracsis-{os.getuid()}.sock")
+
+
+def is_private(path: str) -> bool:
+    """Check that `path` belongs to this user and no one else can use it"""
+    try:
+        st = os.lstat(path)
+    except OSError:
+        return False
+    return st.st_uid == os.getuid() and not st.st_mode & 0o077
+
+
+LOG_PATH = os.path.join(os.path.dirname(__file__), '.tracsis_daemon.log')
+
+# Commands run by the daemon when it is up; everything else always runs in-process
+FORWARDED_COMMANDS = ('login', 'tasks', 'logs', 'snap', 'create-task', 'sync')
+
+# Seconds without a command before the daemon exits
+DEFAULT_IDLE_TIMEOUT = 3600
+
+# Seconds `daemon start` waits for the socket to appear
+START_TIMEOUT = 10
+
+# Environment the CLI and requests read; each command runs in the client's values
+FORWARDED_ENV = (
+    'TRACSIS_BASE_URL', 'NO_COLOR',
+    'HTTP_PROXY', 'HTTPS_PROXY', 'ALL_PROXY', 'NO_PROXY',
+    'http_proxy', 'https_proxy', 'all_proxy', 'no_proxy',
+    'REQUESTS_CA_BUNDLE', 'CURL_CA_BUNDLE',
+)
+
+
+def send_message(stream, message: Dict[str, Any]):
+    """Write one newline-delimited JSON message"""
+    stream.write(json.dumps(message).encode() + b'\n')
+    stream.flush()
+
+
+def receive_message(stream) -> Optional[Dict[str, Any]]:
+    """Read one message, or None once the other side has closed the connection"""
+    line = stream.readline()
+    if not line:
+        return None
+    return json.loads(line)
+
+
+def peer_uid(sock: socket.socket) -> Optional[int]:
+    """User ID of the process at the other end of a Unix socket, where the platform tells"""
+    if not hasattr(socket, 'SO_PEERCRED'):
+        return None
+    credentials = sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize('3i'))
+    return struct.unpack('3i', credentials)[1]
+
+
+def connect() -> Optional[socket.socket]:
+    """Connect to the running daemon, or return None if there is none
+
+    A socket someone else could have put in place is never used, as commands
+    and their prompt replies (passwords included) go through it.
+    """
+    if not hasattr(socket, 'AF_UNIX'):
+        return None
+    try:
+        path = socket_path()
+    except OSError:
+        return None
+    if not is_private(os.path.dirname(path)) or not is_private(path):
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(path)
+        uid = peer_uid(sock)
+    except OSError:
+        sock.close()
+        return None
+    if uid is not None and uid != os.getuid():
+        sock.close()
+        return None
+    return sock
+
+
+def request(message: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Send a control message and return the daemon's reply, or None if it is not running"""
+    sock = connect()
+    if sock is None:
+        return None
+    with sock, sock.makefile('rwb') as stream:
+        send_message(stream, message)
+        return receive_message(stream)
+
+
+def forward(argv: List[str]) -> Optional[int]:
+    """Run a command in the daemon, relaying its output and prompts to this terminal
+
+    Returns:
+        Exit code of the command, or None if no daemon is running
+    """
+    sock = connect()
+    if sock is None:
+        return None
+    with sock, sock.makefile('rwb') as stream:
+        send_message(stream, {'argv': argv, 'cwd': os.getcwd(), 'tty': sys.stdout.isatty(),
+                              'env': {name: os.environ.get(name) for name in FORWARDED_ENV}})
+        while True:
+            message = receive_message(stream)
+            if message is None:
+                print("\n✗ Lost connection to the tracsis daemon")
+                return 1
+            if 'out' in message:
+                sys.stdout.write(message['out'])
+                sys.stdout.flush()
+            elif 'input' in message:
+                try:
+                    send_message(stream, {'line': input(message['input'])})
+                except EOFError:
+                    send_message(stream, {'eof': True})
+            elif 'exit' in message:
+                return message['exit']
+
+
+@contextmanager
+def client_environment(env: Dict[str, Optional[str]]):
+    """Set the client's FORWARDED_ENV values (None unsets) for the duration of a command"""
+    saved = {name: os.environ.get(name) for name in FORWARDED_ENV}
+
+    def apply(values):
+        for name in FORWARDED_ENV:
+            if values.get(name) is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = values[name]
+
+    apply(env)
+    try:
+        yield
+    finally:
+        apply(saved)
+
+
+class ClientOutput:
+    """File-like object sending everything written to it to the connected client
+
+    Reports itself as a terminal when the client's stdout is one, so
+    commands pick the same output format and colours as they would locally.
+    """
+
+    def __init__(self, stream, tty: bool = False):
+        self.stream = stream
+        self.tty = tty
+        self.buffer = ''
+
+    def write(self, text: str) -> int:
+        self.buffer += text
+        if '\n' in self.buffer:
+            self.flush()
+        return len(text)
+
+    def flush(self):
+        if self.buffer:
+            text, self.buffer = self.buffer, ''
+            send_message(self.stream, {'out': text})
+
+    def isatty(self) -> bool:
+        return self.tty
+
+
+class DaemonServer(socketserver.UnixStreamServer):
+    """Serves one command at a time with a single long-lived TracsisAPI
+
+    Commands are handled sequentially, so redirecting stdout, input() and the
+    working directory for the duration of a command is safe.
+    """
+
+    def __init__(self, path: str, idle_timeout: int):
+        self.started_at = time.time()
+        self.last_used = self.started_at
+        self.idle_timeout = idle_timeout
+        self.commands_served = 0
+        self.stopping = False
+        super().__init__(path, DaemonRequestHandler)
+        os.chmod(path, 0o600)
+
+    def serve_until_idle(self):
+        self.timeout = min(60, self.idle_timeout)
+        while not self.stopping and time.time() - self.last_used < self.idle_timeout:
+            self.handle_request()
+
+    def status(self) -> Dict[str, Any]:
+        import command_handlers
+        api = command_handlers.api_instance
+        return {
+            'pid': os.getpid(),
+            'uptime': time.time() - self.started_at,
+            'commands_served': self.commands_served,
+            'authenticated': api is not None and api.is_authenticated()
+        }
+
+    def run_command(self, argv: List[str], cwd: str, stream, tty: bool = False,
+                    env: Optional[Dict[str, Optional[str]]] = None) -> int:
+        """Parse and dispatch a forwarded command with its output sent to the client
+
+        The command sees the client's working directory and FORWARDED_ENV values.
+        """
+        import builtins
+        import traceback
+        from contextlib import redirect_stderr, redirect_stdout
+        import command_handlers
+        from tracsis_cli import run_command, setup_parsers
+
+        out = ClientOutput(stream, tty)
+
+        def remote_input(prompt=''):
+            out.flush()
+            send_message(stream, {'input': str(prompt)})
+            reply = receive_message(stream)
+            if reply is None or reply.get('eof'):
+                raise EOFError
+            return reply['line']
+
+        original_input = builtins.input
+        builtins.input = remote_input
+        try:
+            with redirect_stdout(out), redirect_stderr(out), client_environment(env or {}):
+                try:
+                    args = setup_parsers().parse_args(argv)
+                    os.chdir(cwd)
+                    command_handlers.reset_command_options(command_handlers.get_api_instance())
+                    run_command(args)
+                    code = 0
+                except SystemExit as e:
+                    if e.code is None or isinstance(e.code, int):
+                        code = e.code or 0
+                    else:
+                        print(e.code)
+                        code = 1
+                except (BrokenPipeError, ConnectionResetError):
+                    return 1
+                except Exception:
+                    traceback.print_exc()
+                    code = 1
+                out.flush()
+        finally:
+            builtins.input = original_input
+        return code
+
+
+class DaemonRequestHandler(socketserver.StreamRequestHandler):
+
+    def handle(self):
+        stream = self.connection.makefile('rwb')
+        try:
+            message = receive_message(stream)
+            if message is None:
+                return
+            control = message.get('control')
+            if control == 'status':
+                send_message(stream, self.server.status())
+            elif control == 'stop':
+                self.server.stopping = True
+                send_message(stream, {'exit': 0})
+            elif 'argv' in message:
+                code = self.server.run_command(message['argv'], message.get('cwd', os.getcwd()), stream,
+                                               bool(message.get('tty')), message.get('env'))
+                self.server.commands_served += 1
+                send_message(stream, {'exit': code})
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            self.server.last_used = time.time()
+            try:
+                stream.close()
+            except (BrokenPipeError, ConnectionResetError):
+                # The client went away with output still buffered
+                pass
+
+
+def run(idle_timeout: int = DEFAULT_IDLE_TIMEOUT):
+    """Run the daemon in the foreground until stopped or idle"""
+    import command_handlers
+
+    path = socket_path()
+    if not is_private(os.path.dirname(path)):
+        print(f"Error: {os.path.dirname(path)} must be a directory only you can access (mode 0700)")
+        sys.exit(1)
+    if request({'control': 'status'}) is not None:
+        print(f"Error: A tracsis daemon is already listening on {path}")
+        sys.exit(1)
+    if os.path.exists(path):
+        # Left behind by a daemon that did not shut down cleanly
+        os.remove(path)
+
+    # Sign in up front so the first forwarded command is already warm
+    api = command_handlers.get_api_instance()
+    if api.check_credentials():
+        try:
+            command_handlers.ensure_authenticated(api)
+        except SystemExit:
+            print("Warning: Could not sign in; commands will retry")
+
+    old_umask = os.umask(0o177)
+    try:
+        server = DaemonServer(path, idle_timeout)
+    finally:
+        os.umask(old_umask)
+    print(f"Tracsis daemon {os.getpid()} listening on {path}", flush=True)
+    try:
+        server.serve_until_idle()
+    finally:
+        server.server_close()
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+    print("Tracsis daemon stopped", flush=True)
+
+
+def start(idle_timeout: int = DEFAULT_IDLE_TIMEOUT) -> Optional[Dict[str, Any]]:
+    """Launch the daemon in the background and wait until it accepts connections
+
+    Returns:
+        Status of the started daemon, or None if it did not come up
+    """
+    cli = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tracsis_cli.py')
+    with open(LOG_PATH, 'a') as log:
+        subprocess.Popen(
+            [sys.executable, cli, 'daemon', 'run', '--idle-timeout', str(idle_timeout)],
+            stdin=subprocess.DEVNULL, stdout=log, stderr=subprocess.STDOUT,
+            start_new_session=True
+        )
+
+    deadline = time.time() + START_TIMEOUT
+    while time.time() < deadline:
+        status = request({'control': 'status'})
+        if status is not None:
+            return status
+        time.sleep(0.1)
+    return None
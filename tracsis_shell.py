@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Tracsis Interactive Shell
+Runs CLI commands in one process so the API session and login are reused
+"""
+
+import argparse
+import os
+import shlex
+from typing import Dict, List, Tuple
+
+# Shell-only commands besides the CLI subcommands
+SHELL_COMMANDS = ('help', 'exit', 'quit')
+
+# CLI subcommands that make no sense inside the shell
+EXCLUDED_COMMANDS = ('shell', 'daemon')
+
+# Commands whose positional arguments are task IDs
+TASK_ID_COMMANDS = ('logs', 'snap')
+
+# Options taking a task ID
+TASK_ID_OPTIONS = ('--task-id',)
+
+HISTORY_PATH = os.path.join(os.path.expanduser('~'), '.tracsis_history')
+HISTORY_LENGTH = 1000
+
+
+def subcommands(parser: argparse.ArgumentParser) -> Dict[str, Tuple[argparse.ArgumentParser, str]]:
+    """Subcommand name to (parser, help text) mapping of the CLI parser"""
+    for action in parser._actions:
+        if isinstance(action, argparse._SubParsersAction):
+            helps = {choice.dest: choice.help for choice in action._choices_actions}
+            return {name: (subparser, helps.get(name) or '') for name, subparser in action.choices.items()}
+    return {}
+
+
+def global_options(parser: argparse.ArgumentParser, args: argparse.Namespace) -> List[str]:
+    """Command line tokens reproducing the global options set in `args`
+
+    The shell prepends them to every line, so `tracsis --base-url X shell`
+    runs each command against X just like `tracsis --base-url X tasks`.
+    """
+    argv = []
+    for action in parser._actions:
+        if not action.option_strings or isinstance(action, (argparse._HelpAction, argparse._SubParsersAction)):
+            continue
+        value = getattr(args, action.dest, action.default)
+        if value == action.default:
+            continue
+        argv.append(action.option_strings[0])
+        if action.nargs != 0:
+            argv.append(str(value))
+    return argv
+
+
+class SessionIndex:
+    """Task IDs seen in grid responses during the session
+
+    Registered as a TracsisAPI grid hook, so every page fetched by any
+    command feeds completion.
+    """
+
+    def __init__(self):
+        self.tasks = {}
+
+    def __call__(self, slug: str, response: dict):
+        for item in (response.get('data') or {}).get('items') or []:
+            task_id = item.get('hidden_task_id', item.get('task_id'))
+            if task_id is not None:
+                self.tasks.setdefault(str(task_id), item.get('task_title'))
+
+
+class TracsisShell:
+    """Read-eval loop dispatching the regular command handlers"""
+
+    prompt = 'tracsis> '
+
+    def __init__(self, launch_args: argparse.Namespace = None):
+        from tracsis_cli import setup_parsers
+
+        self.parser = setup_parsers()
+        # Global options the shell was started with, applied to every command
+        self.global_argv = global_options(self.parser, launch_args) if launch_args else []
+        self.commands = {name: command for name, command in subcommands(self.parser).items()
+                         if name not in EXCLUDED_COMMANDS}
+        self.index = SessionIndex()
+        self.matches = []
+
+    def candidates(self, line: str, text: str) -> List[str]:
+        """Completion candidates for the word `text` at the end of `line`"""
+        words = shlex.split(line) if line.strip() else []
+        if text and words:
+            words = words[:-1]
+        if not words:
+            options = list(self.commands) + list(SHELL_COMMANDS)
+        elif words[0] not in self.commands:
+            options = []
+        elif text.startswith('-'):
+            options = [option for action in self.commands[words[0]][0]._actions
+                       for option in action.option_strings]
+        elif words[-1] in TASK_ID_OPTIONS or words[0] in TASK_ID_COMMANDS:
+            options = list(self.index.tasks)
+            if words[0] == 'logs' and len(words) == 1:
+                options.append('import')
+        else:
+            options = []
+        return sorted(option for option in options if option.startswith(text))
+
+    def complete(self, text: str, state: int):
+        """readline completer"""
+        import readline
+
+        if state == 0:
+            line = readline.get_line_buffer()[:readline.get_begidx()] + text
+            try:
+                self.matches = self.candidates(line, text)
+            except ValueError:
+                # Unbalanced quotes
+                self.matches = []
+        return self.matches[state] if state < len(self.matches) else None
+
+    def setup_readline(self):
+        import readline
+
+        if 'libedit' in (readline.__doc__ or ''):
+            readline.parse_and_bind('bind ^I rl_complete')
+        else:
+            readline.parse_and_bind('tab: complete')
+        readline.set_completer_delims(' \t\n')
+        readline.set_history_length(HISTORY_LENGTH)
+        try:
+            readline.read_history_file(HISTORY_PATH)
+        except OSError:
+            pass
+
+    def execute(self, argv: List[str]):
+        """Run one CLI command in this process"""
+        import command_handlers
+        from tracsis_cli import run_command
+
+        try:
+            args = self.parser.parse_args(self.global_argv + argv)
+            command_handlers.reset_command_options(command_handlers.get_api_instance())
+            run_command(args)
+        except SystemExit:
+            # Handlers exit on errors; the shell keeps running
+            pass
+        except KeyboardInterrupt:
+            print("\nInterrupted")
+
+    def run(self):
+        import readline
+        import command_handlers
+
+        self.setup_readline()
+        command_handlers.get_api_instance().grid_hooks.append(self.index)
+
+        print("Tracsis shell. Type 'help' for commands, 'exit' to quit.")
+        try:
+            while True:
+                # Handlers may install their own completer for prompts
+                readline.set_completer(self.complete)
+                try:
+                    line = input(self.prompt)
+                except EOFError:
+                    print()
+                    break
+                except KeyboardInterrupt:
+                    print()
+                    continue
+
+                try:
+                    argv = shlex.split(line)
+                except ValueError as e:
+                    print(f"Error: {e}")
+                    continue
+                if not argv:
+                    continue
+                if argv[0] in ('exit', 'quit'):
+                    break
+                if argv[0] == 'help':
+                    self.print_help()
+                    continue
+                if argv[0] in EXCLUDED_COMMANDS:
+                    print(f"Error: '{argv[0]}' is not available inside the shell")
+                    continue
+
+                readline.set_completer(None)
+                self.execute(argv)
+        finally:
+            try:
+                readline.write_history_file(HISTORY_PATH)
+            except OSError:
+                pass
+
+    def print_help(self):
+        print("Commands:")
+        for name, (_, help_text) in self.commands.items():
+            print(f"  {name:<12} {help_text}")
+        print(f"  {'help':<12} Show this list")
+        print(f"  {'exit':<12} Leave the shell")
+        print("\nRun '<command> -h' for the options of a command. Tab completes commands, "
+              "options and task IDs seen in this session.")
@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Tracsis Transport
+Connection pooling, timeouts and retry policy of the API client's HTTP session
+"""
+
+import random
+import socket
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, Optional
+from urllib.parse import urlparse
+
+import requests
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import NewConnectionError
+
+
+# Statuses worth retrying for requests without side effects
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Statuses meaning the server turned the request away unprocessed, so even
+# requests with side effects (creating tasks, logging work) may be resent
+UNPROCESSED_STATUSES = (429, 503)
+
+
+class TransportSettings:
+    """Tunable knobs of the HTTP transport
+
+    Read from the optional "transport" section of config.json, e.g.
+    {"transport": {"read_timeout": 60, "retries": 5}}; CLI flags override it.
+    """
+
+    FIELDS = {
+        'pool_size': int,           # Connections kept per host
+        'connect_timeout': float,   # Seconds to establish a connection
+        'read_timeout': float,      # Seconds to wait for response data
+        'retries': int,             # Retries after the first attempt
+        'backoff': float,           # Base of the exponential backoff, in seconds
+        'max_backoff': float,       # Longest wait between attempts, Retry-After included
+    }
+
+    def __init__(self, pool_size: int = 10, connect_timeout: float = 5.0, read_timeout: float = 30.0,
+                 retries: int = 3, backoff: float = 0.5, max_backoff: float = 30.0):
+        """
+        Raises:
+            ValueError: If a value is out of range, e.g. negative retries
+        """
+        if pool_size < 1:
+            raise ValueError(f"pool_size must be at least 1, got {pool_size}")
+        if connect_timeout <= 0 or read_timeout <= 0:
+            raise ValueError("Timeouts must be greater than 0")
+        if retries < 0:
+            raise ValueError(f"retries must not be negative, got {retries}")
+        if backoff < 0 or max_backoff < 0:
+            raise ValueError("Backoff times must not be negative")
+        self.pool_size = pool_size
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+
+    @classmethod
+    def from_dict(cls, values: Dict[str, Any]) -> 'TransportSettings':
+        """Build settings from a dict, ignoring unknown keys and None values"""
+        return cls(**{key: cls.FIELDS[key](value) for key, value in values.items()
+                      if key in cls.FIELDS and value is not None})
+
+    @property
+    def timeout(self):
+        """(connect, read) timeout tuple for requests"""
+        return (self.connect_timeout, self.read_timeout)
+
+
+# Connection setup timings of the current thread's latest request
+_timings = threading.local()
+
+# Time DNS resolution with a separate lookup before each new connection.
+# Off by default as it costs an extra lookup; --trace and --profile turn it on.
+MEASURE_DNS = False
+
+
+class TimedConnectionMixin:
+    """Records how long opening a connection took (DNS, TCP and TLS handshake)"""
+
+    def _new_conn(self):
+        if MEASURE_DNS:
+            start = time.perf_counter()
+            try:
+                socket.getaddrinfo(self._dns_host, self.port, 0, socket.SOCK_STREAM)
+            except OSError:
+                pass
+            _timings.dns = time.perf_counter() - start
+        return super()._new_conn()
+
+    def connect(self):
+        _timings.dns = None
+        start = time.perf_counter()
+        super().connect()
+        _timings.connect = time.perf_counter() - start - (_timings.dns or 0)
+
+
+class TimedHTTPConnection(TimedConnectionMixin, HTTPConnection):
+    pass
+
+
+class TimedHTTPSConnection(TimedConnectionMixin, HTTPSConnection):
+    pass
+
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+class TimedHTTPAdapter(requests.adapters.HTTPAdapter):
+    """HTTPAdapter whose connections record their setup time for tracing"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': TimedHTTPConnectionPool,
+            'https': TimedHTTPSConnectionPool,
+        }
+
+
+def pop_connection_timings() -> Dict[str, Optional[float]]:
+    """DNS and connect seconds of the calling thread's latest request
+
+    Both are 0 when the request reused a kept-alive connection; dns is None
+    unless MEASURE_DNS is on.
+    """
+    timings = {'dns': getattr(_timings, 'dns', 0.0), 'connect': getattr(_timings, 'connect', 0.0)}
+    _timings.dns = 0.0
+    _timings.connect = 0.0
+    return timings
+
+
+def attempt_record(url: str, payload: Dict[Any, Any], attempt: int, started: float, seconds: float,
+                   response: Optional[requests.Response] = None,
+                   error: Optional[Exception] = None) -> Dict[str, Any]:
+    """Trace record of one HTTP attempt"""
+    bytes_in = None
+    if response is not None:
+        try:
+            # Bytes read off the wire, before gzip/deflate decoding
+            bytes_in = response.raw.tell()
+        except AttributeError:
+            bytes_in = len(response.content)
+    return {
+        'event': 'request',
+        'time': started,
+        'endpoint': urlparse(url).path,
+        'slug': payload.get('slug'),
+        'page': payload.get('page'),
+        'attempt': attempt,
+        'status': response.status_code if response is not None else None,
+        'error': str(error) if error is not None else None,
+        'bytes_out': len(response.request.body or b'') if response is not None else None,
+        'bytes_in': bytes_in,
+        **pop_connection_timings(),
+        'ttfb': response.elapsed.total_seconds() if response is not None else None,
+        'total': seconds,
+    }
+
+
+def mount_adapters(session: requests.Session, pool_size: int,
+                   factory: Optional[Callable[[int], requests.adapters.BaseAdapter]] = None):
+    """Mount pooled adapters on a session
+
+    The adapters do not retry themselves; send_with_retries owns the policy.
+
+    Args:
+        session: Session to mount on
+        pool_size: Connections kept per host
+        factory: Builds the adapter from the pool size instead of the default
+            TimedHTTPAdapter, e.g. to record or replay a cassette
+    """
+    if factory is not None:
+        adapter = factory(pool_size)
+    else:
+        adapter = TimedHTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait according to a Retry-After header (delta seconds or HTTP date)"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def retry_delay(attempt: int, settings: TransportSettings, retry_after: Optional[float] = None) -> float:
+    """Seconds to wait before retry number `attempt` (0-based)
+
+    Uses the server's Retry-After when given, otherwise exponential backoff
+    with full jitter; both are capped at settings.max_backoff.
+    """
+    if retry_after is not None:
+        return min(retry_after, settings.max_backoff)
+    return random.uniform(0, min(settings.max_backoff, settings.backoff * 2 ** attempt))
+
+
+def is_retryable_error(error: requests.exceptions.RequestException, idempotent: bool) -> bool:
+    """Check whether a failed request may be sent again"""
+    if not isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)):
+        return False
+    if idempotent or isinstance(error, requests.exceptions.ConnectTimeout):
+        return True
+    # A request with side effects is only resent if it never reached the server
+    reason = getattr(error.args[0], 'reason', None) if error.args else None
+    return isinstance(reason, NewConnectionError)
+
+
+def is_retryable_status(status_code: int, idempotent: bool) -> bool:
+    return status_code in (RETRY_STATUSES if idempotent else UNPROCESSED_STATUSES)
+
+
+def send_with_retries(session: requests.Session, url: str, payload: Dict[Any, Any],
+                      settings: TransportSettings, idempotent: bool = True,
+                      on_attempt: Optional[Callable[[Dict[str, Any]], None]] = None) -> requests.Response:
+    """POST a JSON payload with timeouts, retrying transient failures
+
+    Args:
+        session: Session to send through
+        url: Endpoint URL
+        payload: JSON body
+        settings: Timeouts and retry policy
+        idempotent: False for requests with side effects, which are only
+            retried when the server cannot have processed them
+        on_attempt: Called with an attempt_record after every attempt
+
+    Returns:
+        The last response, whatever its status
+
+    Raises:
+        requests.exceptions.RequestException: If the last attempt failed without a response
+    """
+    for attempt in range(settings.retries + 1):
+        last_attempt = attempt == settings.retries
+        started = time.time()
+        start = time.perf_counter()
+        try:
+            response = session.post(url, json=payload, timeout=settings.timeout)
+        except requests.exceptions.RequestException as e:
+            if on_attempt is not None:
+                on_attempt(attempt_record(url, payload, attempt, started, time.perf_counter() - start, error=e))
+            if last_attempt or not is_retryable_error(e, idempotent):
+                raise
+            time.sleep(retry_delay(attempt, settings))
+            continue
+        if on_attempt is not None:
+            on_attempt(attempt_record(url, payload, attempt, started, time.perf_counter() - start, response))
+
+        if last_attempt or not is_retryable_status(response.status_code, idempotent):
+            return response
+        delay = retry_delay(attempt, settings, parse_retry_after(response.headers.get('Retry-After')))
+        response.close()
+        time.sleep(delay)